@@ -2,22 +2,119 @@ import httpx
 import logging
 import re
 
-from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
 
-from app.adapters.base import BaseAdapter
+from app.adapters.base import AdapterBlockedError, AdapterError, BaseAdapter
+from app.adapters.http import new_httpx_client
+from app.adapters.throttle import get_throttle
 from app.models.schemas import ProductResult, Platform
 from app.config import get_settings
-from app.utils.text import clean_price, extract_brand, compute_discount
+from app.services.executor import run_cpu
+from app.utils.features import text_features
+from app.utils.text import clean_price, compute_discount
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Compiled once; selectors are matched by hand in _scan_card
+_RESULT_CARDS = etree.XPath('//*[@data-component-type="s-search-result"]')
+_TEXT_NODES = etree.XPath(".//text()[not(ancestor::script or ancestor::style)]")
+_NUMBER = re.compile(r"([\d.]+)")
+_DIGITS = re.compile(r"([\d]+)")
+
+
+def _text(el) -> str:
+    """Concatenated text of an element, like BeautifulSoup's get_text()."""
+    return "".join(_TEXT_NODES(el))
+
+
+def _spaced_text(el) -> str:
+    """Stripped text pieces joined by spaces, like get_text(" ", strip=True)."""
+    return " ".join(t.strip() for t in _TEXT_NODES(el) if t.strip())
+
+
+def _ancestor_classes(el, card) -> list[tuple[str, set[str]]]:
+    """(tag, class set) of each ancestor of el, up to but excluding the card."""
+    classes = []
+    for parent in el.iterancestors():
+        if parent is card:
+            break
+        classes.append((parent.tag, set(parent.get("class", "").split())))
+    return classes
+
+
+def _scan_card(card) -> dict | None:
+    """
+    Walk a result card once, keeping the first element for each field.
+
+    Mirrors the per-field CSS selectors the parser used to run one by one:
+      sponsored_label   [class*="sponsored"], .puis-label-popover-default
+      image             img.s-image
+      h2 / h2_link      h2 / h2 a
+      price             span.a-price span.a-offscreen
+      price_whole       .a-price .a-price-whole
+      mrp               span.a-price.a-text-price span.a-offscreen
+      rating            span.a-icon-alt
+      rating_count      span[aria-label*="ratings"]
+      rating_count_link .a-size-base.s-underline-text
+    Returns None for sponsored results ([data-component-type="sp-sponsored-result"]).
+    """
+    fields: dict = {}
+    for el in card.iterdescendants():
+        tag = el.tag
+        if not isinstance(tag, str):  # comments, processing instructions
+            continue
+        if el.get("data-component-type") == "sp-sponsored-result":
+            return None
+        class_attr = el.get("class", "")
+        classes = set(class_attr.split())
+
+        if "sponsored_label" not in fields and (
+            "sponsored" in class_attr or "puis-label-popover-default" in classes
+        ):
+            fields["sponsored_label"] = el
+
+        if tag == "img":
+            if "image" not in fields and "s-image" in classes:
+                fields["image"] = el
+        elif tag == "h2":
+            fields.setdefault("h2", el)
+        elif tag == "a":
+            if "h2_link" not in fields and any(
+                t == "h2" for t, _ in _ancestor_classes(el, card)
+            ):
+                fields["h2_link"] = el
+        elif tag == "span":
+            if "a-offscreen" in classes and ("price" not in fields or "mrp" not in fields):
+                ancestors = [c for t, c in _ancestor_classes(el, card) if t == "span"]
+                if "price" not in fields and any("a-price" in c for c in ancestors):
+                    fields["price"] = el
+                if "mrp" not in fields and any({"a-price", "a-text-price"} <= c for c in ancestors):
+                    fields["mrp"] = el
+            if "rating" not in fields and "a-icon-alt" in classes:
+                fields["rating"] = el
+            if "rating_count" not in fields and "ratings" in el.get("aria-label", ""):
+                fields["rating_count"] = el
+
+        if "price_whole" not in fields and "a-price-whole" in classes and any(
+            "a-price" in c for _, c in _ancestor_classes(el, card)
+        ):
+            fields["price_whole"] = el
+        if "rating_count_link" not in fields and {"a-size-base", "s-underline-text"} <= classes:
+            fields["rating_count_link"] = el
+
+    return fields
+
 
 class AmazonAdapter(BaseAdapter):
-    """Adapter for Amazon India using HTTP + BeautifulSoup scraping."""
+    """Adapter for Amazon India using HTTP + lxml scraping."""
 
     SEARCH_URL = "https://www.amazon.in/s"
 
+    def __init__(self) -> None:
+        self._client: httpx.AsyncClient | None = None
+
     @property
     def platform(self) -> Platform:
         return Platform.AMAZON
@@ -30,6 +127,20 @@ class AmazonAdapter(BaseAdapter):
     def base_url(self) -> str:
         return "https://www.amazon.in"
 
+    async def start(self) -> None:
+        self._get_client()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared pooled client, creating it on first use."""
+        if self._client is None:
+            self._client = new_httpx_client(follow_redirects=True)
+        return self._client
+
     def _headers(self) -> dict:
         return {
             "User-Agent": settings.user_agent,
@@ -41,43 +152,44 @@ class AmazonAdapter(BaseAdapter):
         }
 
     async def search(self, query: str, limit: int = 10) -> list[ProductResult]:
-        results: list[ProductResult] = []
         try:
-            async with httpx.AsyncClient(
-                timeout=settings.request_timeout, follow_redirects=True
-            ) as client:
-                params = {
-                    "k": query,
-                    "i": "beauty",  # search within beauty category
-                    "ref": "nb_sb_noss",
-                }
-                resp = await client.get(
+            params = {
+                "k": query,
+                "i": "beauty",  # search within beauty category
+                "ref": "nb_sb_noss",
+            }
+            async with get_throttle(self.platform.value).slot():
+                resp = await self._get_client().get(
                     self.SEARCH_URL,
                     params=params,
                     headers=self._headers(),
                 )
-                resp.raise_for_status()
-                results = self._parse_search_page(resp.text, limit)
+        except httpx.TimeoutException as e:
+            raise AdapterError("Amazon: request timed out") from e
+        except httpx.HTTPError as e:
+            raise AdapterError(f"Amazon: request failed: {e}") from e
 
-        except httpx.TimeoutException:
-            logger.error("Amazon: request timed out")
-        except httpx.HTTPStatusError as e:
-            logger.error(f"Amazon: HTTP {e.response.status_code}")
-        except Exception as e:
-            logger.error(f"Amazon: unexpected error: {e}")
+        # Amazon answers bots with 503s or a captcha page
+        if resp.status_code == 503:
+            raise AdapterBlockedError("Amazon: HTTP 503")
+        if resp.status_code != 200:
+            raise AdapterError(f"Amazon: HTTP {resp.status_code}")
+        if "validateCaptcha" in resp.text:
+            raise AdapterBlockedError("Amazon: captcha page")
 
-        return results
+        return await run_cpu(self._parse_search_page, resp.text, limit)
 
-    def _parse_search_page(self, html: str, limit: int) -> list[ProductResult]:
-        soup = BeautifulSoup(html, "lxml")
+    @classmethod
+    def _parse_search_page(cls, html: str | bytes, limit: int) -> list[ProductResult]:
+        tree = lxml_html.document_fromstring(html)
         results: list[ProductResult] = []
 
         # Amazon search result cards
-        cards = soup.select('[data-component-type="s-search-result"]')
+        cards = _RESULT_CARDS(tree)
 
         for card in cards[:limit * 2]:  # parse extra, filter later
             try:
-                result = self._parse_card(card)
+                result = cls._parse_card(card)
                 if result:
                     results.append(result)
                     if len(results) >= limit:
@@ -88,88 +200,79 @@ class AmazonAdapter(BaseAdapter):
 
         return results
 
-    def _parse_card(self, card) -> ProductResult | None:
-        # Skip sponsored/ad results
-        if card.select_one('[data-component-type="sp-sponsored-result"]'):
+    @staticmethod
+    def _parse_card(card) -> ProductResult | None:
+        """Parse one result card in a single walk over its elements."""
+        fields = _scan_card(card)
+        if fields is None:
             return None
-        # Also check for "Sponsored" label text
-        sponsored_el = card.select_one('[class*="sponsored"], .puis-label-popover-default')
-        if sponsored_el and "ponsored" in (sponsored_el.get_text() or ""):
+
+        # Skip results carrying a "Sponsored" label
+        sponsored_el = fields.get("sponsored_label")
+        if sponsored_el is not None and "ponsored" in _text(sponsored_el):
             return None
 
         # Product name - try multiple strategies to get full title
         name = ""
         # Strategy 1: image alt text (most reliable - Amazon always puts full title here)
-        img_el = card.select_one("img.s-image")
-        if img_el:
+        img_el = fields.get("image")
+        if img_el is not None:
             name = img_el.get("alt", "").strip()
         # Strategy 2: h2 full text with all spans
         if not name or len(name) < 10:
-            h2_el = card.select_one("h2")
-            if h2_el:
-                name = h2_el.get_text(" ", strip=True)
+            h2_el = fields.get("h2")
+            if h2_el is not None:
+                name = _spaced_text(h2_el)
         # Strategy 3: aria-label on card link
+        link_el = fields.get("h2_link")
         if not name or len(name) < 10:
-            h2_link = card.select_one("h2 a")
-            if h2_link and h2_link.get("aria-label"):
-                name = h2_link.get("aria-label", "")
+            if link_el is not None and link_el.get("aria-label"):
+                name = link_el.get("aria-label", "")
 
         if not name or len(name) < 5:
             return None
 
         # Product URL
-        link_el = card.select_one("h2 a")
-        href = link_el.get("href", "") if link_el else ""
+        href = link_el.get("href", "") if link_el is not None else ""
         product_url = f"https://www.amazon.in{href}" if href and not href.startswith("http") else href
 
-        # Price - current selling price
+        # Price - current selling price, else the whole-rupee part
         price = 0.0
-        price_el = card.select_one("span.a-price span.a-offscreen")
-        if price_el:
-            price = clean_price(price_el.get_text())
-
-        if price <= 0:
-            # Try alternative price selector
-            price_el = card.select_one(".a-price .a-price-whole")
-            if price_el:
-                price = clean_price(price_el.get_text())
+        for key in ("price", "price_whole"):
+            if price <= 0 and fields.get(key) is not None:
+                price = clean_price(_text(fields[key]))
 
         if price <= 0:
             return None
 
         # MRP (original price)
         mrp = 0.0
-        mrp_el = card.select_one("span.a-price.a-text-price span.a-offscreen")
-        if mrp_el:
-            mrp = clean_price(mrp_el.get_text())
+        if fields.get("mrp") is not None:
+            mrp = clean_price(_text(fields["mrp"]))
 
         discount = compute_discount(price, mrp) if mrp > 0 else 0.0
 
         # Image
-        img_el = card.select_one("img.s-image")
-        image_url = img_el.get("src", "") if img_el else ""
+        image_url = img_el.get("src", "") if img_el is not None else ""
 
         # Rating
         rating = 0.0
-        rating_el = card.select_one("span.a-icon-alt")
-        if rating_el:
-            rating_text = rating_el.get_text()
-            match = re.search(r"([\d.]+)", rating_text)
+        if fields.get("rating") is not None:
+            match = _NUMBER.search(_text(fields["rating"]))
             if match:
                 rating = float(match.group(1))
 
         # Rating count
         rating_count = 0
-        count_el = card.select_one('span[aria-label*="ratings"]') or card.select_one(
-            ".a-size-base.s-underline-text"
-        )
-        if count_el:
-            count_text = count_el.get_text().replace(",", "")
-            match = re.search(r"([\d]+)", count_text)
+        count_el = fields.get("rating_count")
+        if count_el is None:
+            count_el = fields.get("rating_count_link")
+        if count_el is not None:
+            match = _DIGITS.search(_text(count_el).replace(",", ""))
             if match:
                 rating_count = int(match.group(1))
 
-        brand = extract_brand(name)
+        brand = text_features(name).brand
 
         return ProductResult(
             name=name,
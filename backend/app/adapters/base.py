@@ -3,6 +3,14 @@ from abc import ABC, abstractmethod
 from app.models.schemas import ProductResult, Platform
 
 
+class AdapterError(Exception):
+    """A platform call failed (network error, timeout, bad status)."""
+
+
+class AdapterBlockedError(AdapterError):
+    """The platform refused us (captcha, bot wall, throttling)."""
+
+
 class BaseAdapter(ABC):
     """Abstract base class for all platform adapters."""
 
@@ -27,9 +35,14 @@ class BaseAdapter(ABC):
         """
         Search for products matching the query.
         Returns a list of ProductResult from this platform.
+        Raises AdapterError (AdapterBlockedError when refused) on failure.
         """
         ...
 
+    async def start(self) -> None:
+        """Open long-lived resources. Override if adapter holds connections."""
+        pass
+
     async def close(self) -> None:
         """Cleanup resources. Override if adapter holds connections."""
         pass
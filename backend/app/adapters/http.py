@@ -0,0 +1,40 @@
+import importlib.util
+
+import httpx
+from curl_cffi import CurlOpt
+from curl_cffi.requests import AsyncSession, CurlHttpVersion
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# httpx only speaks HTTP/2 when the optional h2 package is installed
+_H2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def new_httpx_client(**kwargs) -> httpx.AsyncClient:
+    """Create a pooled httpx client sized from settings."""
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    return httpx.AsyncClient(
+        limits=limits,
+        http2=settings.http2 and _H2_AVAILABLE,
+        timeout=settings.request_timeout,
+        **kwargs,
+    )
+
+
+def new_curl_session(impersonate: str = "chrome131") -> AsyncSession:
+    """Create a pooled curl_cffi session sized from settings."""
+    return AsyncSession(
+        impersonate=impersonate,
+        max_clients=settings.http_max_connections,
+        http_version=CurlHttpVersion.V2TLS if settings.http2 else CurlHttpVersion.V1_1,
+        curl_options={
+            CurlOpt.MAXCONNECTS: settings.http_max_keepalive_connections,
+            CurlOpt.MAXAGE_CONN: settings.http_keepalive_expiry,
+        },
+    )
@@ -5,20 +5,112 @@ import json
 from bs4 import BeautifulSoup
 from curl_cffi.requests import AsyncSession
 
-from app.adapters.base import BaseAdapter
+from app.adapters.base import AdapterBlockedError, AdapterError, BaseAdapter
+from app.adapters.http import new_curl_session
+from app.adapters.throttle import AdapterThrottledError, get_throttle
 from app.models.schemas import ProductResult, Platform
 from app.config import get_settings
-from app.utils.text import clean_price, extract_brand, compute_discount
+from app.services.executor import run_cpu
+from app.utils.features import text_features
+from app.utils.text import clean_price, compute_discount
+
+try:
+    import orjson
+except ImportError:  # optional speedup, the stdlib decoder is the fallback
+    orjson = None
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+_STATE_MARKER = b"window.__PRELOADED_STATE__"
+_SCRIPT_END = b"</script>"
+# Search results use searchListingPage, category pages use categoryListing
+_LISTING_KEYS = ("searchListingPage", "categoryListing")
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"\s*")
+
+
+def _listing_products(data: dict) -> list[dict]:
+    """Products from a decoded state, preferring search over category listings."""
+    for key in _LISTING_KEYS:
+        products = data.get(key, {}).get("listingData", {}).get("products", [])
+        if products:
+            return products
+    return []
+
+
+def _extract_preloaded_state(page: bytes) -> dict | None:
+    """
+    Pull window.__PRELOADED_STATE__ out of the raw page without a DOM parse.
+
+    Finds the marker in the bytes and takes the slice up to the end of its
+    script. Only the listing objects are decoded: the stdlib scanner starts
+    at each listing key and stops at its closing brace, skipping the rest
+    of the (much larger) app state. If no listing is found, the whole state
+    is decoded, with orjson when installed. Returns None when the state
+    can't be isolated, so the caller can fall back to BeautifulSoup.
+    """
+    marker = page.find(_STATE_MARKER)
+    if marker < 0:
+        return None
+    start = page.find(b"{", marker + len(_STATE_MARKER))
+    end = page.find(_SCRIPT_END, start)
+    if start < 0 or end < 0:
+        return None
+    chunk = page[start:end]
+    text = chunk.decode("utf-8", errors="replace")
+
+    listings: dict = {}
+    for key in _LISTING_KEYS:
+        pos = text.find(f'"{key}"')
+        colon = text.find(":", pos) if pos >= 0 else -1
+        if colon < 0:
+            continue
+        try:
+            value, _ = _decoder.raw_decode(text, _WHITESPACE.match(text, colon + 1).end())
+        except ValueError:
+            continue
+        if isinstance(value, dict) and "listingData" in value:
+            listings[key] = value
+    if listings:
+        return listings
+
+    data = None
+    if orjson is not None:
+        try:
+            data = orjson.loads(chunk.rstrip().rstrip(b";"))
+        except orjson.JSONDecodeError:
+            pass  # trailing statements in the script; scan instead
+    if data is None:
+        try:
+            data, _ = _decoder.raw_decode(text)
+        except ValueError:
+            return None
+    return data if isinstance(data, dict) else None
+
 
 class NykaaAdapter(BaseAdapter):
     """Adapter for Nykaa using HTML scraping with curl_cffi to bypass Cloudflare."""
 
     SEARCH_URL = "https://www.nykaa.com/search/result/"
 
+    def __init__(self) -> None:
+        self._session: AsyncSession | None = None
+
+    async def start(self) -> None:
+        self.get_session()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def get_session(self) -> AsyncSession:
+        """Return the shared pooled session, creating it on first use."""
+        if self._session is None:
+            self._session = new_curl_session()
+        return self._session
+
     @property
     def platform(self) -> Platform:
         return Platform.NYKAA
@@ -34,26 +126,44 @@ class NykaaAdapter(BaseAdapter):
     async def search(self, query: str, limit: int = 10) -> list[ProductResult]:
         """Search Nykaa by scraping the search results page and extracting __PRELOADED_STATE__."""
         try:
-            async with AsyncSession(impersonate="chrome131") as s:
-                resp = await s.get(
+            async with get_throttle(self.platform.value).slot():
+                resp = await self.get_session().get(
                     self.SEARCH_URL,
                     params={"q": query, "root": "search", "searchType": "Manual"},
                     timeout=settings.request_timeout,
                 )
-                if resp.status_code != 200:
-                    logger.warning(f"Nykaa returned {resp.status_code}")
-                    return []
+        except AdapterThrottledError:
+            raise
+        except Exception as e:
+            raise AdapterError(f"Nykaa: request failed: {e}") from e
 
-                return self._parse_search_page(resp.text, limit)
+        # Cloudflare challenges come back as 403/429
+        if resp.status_code in (403, 429):
+            raise AdapterBlockedError(f"Nykaa: HTTP {resp.status_code}")
+        if resp.status_code != 200:
+            raise AdapterError(f"Nykaa: HTTP {resp.status_code}")
 
-        except Exception as e:
-            logger.error(f"Nykaa: unexpected error: {e}")
-            return []
+        return await run_cpu(self._parse_search_page, resp.content, limit)
 
-    def _parse_search_page(self, html: str, limit: int) -> list[ProductResult]:
+    @classmethod
+    def _parse_search_page(cls, page: bytes | str, limit: int) -> list[ProductResult]:
         """Extract products from Nykaa's window.__PRELOADED_STATE__ JSON."""
+        raw = page.encode() if isinstance(page, str) else page
+        data = _extract_preloaded_state(raw)
+        if data is None:
+            # Marker missing or state not decodable on its own: walk the DOM
+            return cls._parse_search_page_soup(page, limit)
+
+        products = _listing_products(data)
+        if not products:
+            logger.debug("Nykaa: no products in __PRELOADED_STATE__")
+        return cls._parse_products(products, limit)
+
+    @classmethod
+    def _parse_search_page_soup(cls, page: bytes | str, limit: int) -> list[ProductResult]:
+        """Fallback: find the state script through a full BeautifulSoup parse."""
         results: list[ProductResult] = []
-        soup = BeautifulSoup(html, "lxml")
+        soup = BeautifulSoup(page, "lxml")
 
         for script in soup.find_all("script"):
             text = script.string or ""
@@ -74,36 +184,32 @@ class NykaaAdapter(BaseAdapter):
                 logger.warning("Nykaa: failed to parse __PRELOADED_STATE__ JSON")
                 continue
 
-            # Search results use searchListingPage, category pages use categoryListing
-            products = (
-                data.get("searchListingPage", {})
-                .get("listingData", {})
-                .get("products", [])
-            ) or (
-                data.get("categoryListing", {})
-                .get("listingData", {})
-                .get("products", [])
-            )
-
+            products = _listing_products(data)
             if not products:
                 logger.debug("Nykaa: no products in __PRELOADED_STATE__")
                 continue
 
-            for item in products[:limit]:
-                try:
-                    result = self._parse_product(item)
-                    if result:
-                        results.append(result)
-                except Exception as e:
-                    logger.warning(f"Nykaa: failed to parse product: {e}")
-                    continue
-
+            results = cls._parse_products(products, limit)
             if results:
                 return results
 
         return results
 
-    def _parse_product(self, item: dict) -> ProductResult | None:
+    @classmethod
+    def _parse_products(cls, products: list[dict], limit: int) -> list[ProductResult]:
+        results: list[ProductResult] = []
+        for item in products[:limit]:
+            try:
+                result = cls._parse_product(item)
+                if result:
+                    results.append(result)
+            except Exception as e:
+                logger.warning(f"Nykaa: failed to parse product: {e}")
+                continue
+        return results
+
+    @staticmethod
+    def _parse_product(item: dict) -> ProductResult | None:
         name = item.get("name") or item.get("title") or ""
         if not name:
             return None
@@ -143,11 +249,11 @@ class NykaaAdapter(BaseAdapter):
 
         brand_raw = item.get("brandName") or item.get("brand_name") or item.get("brand") or ""
         if isinstance(brand_raw, list):
-            brand = brand_raw[0] if brand_raw else extract_brand(name)
+            brand = brand_raw[0] if brand_raw else text_features(name).brand
         elif isinstance(brand_raw, str):
             brand = brand_raw
         else:
-            brand = extract_brand(name)
+            brand = text_features(name).brand
 
         variant = item.get("variant_name") or item.get("shade") or ""
 
@@ -0,0 +1,136 @@
+import asyncio
+import contextvars
+import logging
+from contextlib import asynccontextmanager
+
+from app.adapters.base import AdapterError
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Absolute loop time by which the current platform call must have started.
+# Set by the search service; requests still queued past it give up instead
+# of hitting the platform with an answer nobody is waiting for.
+request_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "request_deadline", default=None
+)
+
+
+class AdapterThrottledError(AdapterError):
+    """Our own outbound budget ran out before the request could be sent."""
+
+
+class Throttle:
+    """
+    Outbound budget for one platform: a token bucket caps the request rate
+    (with a small burst allowance) and a semaphore caps requests in flight.
+    Waiters queue in arrival order.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, concurrency: int):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self._tokens = float(burst)
+        self._updated: float | None = None
+        self._bucket_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(concurrency)
+        self._waiting = 0
+        self._in_flight = 0
+        self._sent = 0
+        self._rejected = 0
+        self._queue_time = 0.0
+
+    def _remaining(self, loop: asyncio.AbstractEventLoop) -> float | None:
+        deadline = request_deadline.get()
+        return None if deadline is None else deadline - loop.time()
+
+    async def _take_token(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            await asyncio.wait_for(self._bucket_lock.acquire(), timeout=self._remaining(loop))
+        except asyncio.TimeoutError:
+            raise AdapterThrottledError(f"{self.name}: rate budget exhausted before deadline") from None
+        try:
+            while True:
+                now = loop.time()
+                if self._updated is not None:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+                remaining = self._remaining(loop)
+                if remaining is not None and wait > remaining:
+                    raise AdapterThrottledError(f"{self.name}: rate budget exhausted before deadline")
+                await asyncio.sleep(wait)
+        finally:
+            self._bucket_lock.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Wait for a token and a free slot, bounded by the request deadline."""
+        loop = asyncio.get_running_loop()
+        queued_at = loop.time()
+        self._waiting += 1
+        try:
+            remaining = self._remaining(loop)
+            if remaining is not None and remaining <= 0:
+                raise AdapterThrottledError(f"{self.name}: deadline passed while queued")
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=remaining)
+            except asyncio.TimeoutError:
+                raise AdapterThrottledError(f"{self.name}: no free slot before deadline") from None
+            try:
+                await self._take_token(loop)
+            except BaseException:
+                self._slots.release()
+                raise
+        except AdapterThrottledError:
+            self._rejected += 1
+            logger.warning(f"{self.name}: outbound request dropped by throttle")
+            raise
+        finally:
+            self._waiting -= 1
+
+        self._queue_time += loop.time() - queued_at
+        self._sent += 1
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "concurrency": self.concurrency,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "sent": self._sent,
+            "rejected": self._rejected,
+            "avg_queue_ms": round(self._queue_time / self._sent * 1000, 1) if self._sent else 0.0,
+        }
+
+
+_throttles: dict[str, Throttle] = {}
+
+
+def get_throttle(platform: str) -> Throttle:
+    """Return the outbound throttle for a platform, creating it on first use."""
+    if platform not in _throttles:
+        _throttles[platform] = Throttle(
+            platform,
+            rate=settings.platform_rate_limits.get(platform, settings.outbound_rate_limit),
+            burst=settings.outbound_burst,
+            concurrency=settings.platform_concurrency.get(platform, settings.outbound_concurrency),
+        )
+    return _throttles[platform]
+
+
+def get_throttle_stats() -> dict:
+    return {name: throttle.stats() for name, throttle in _throttles.items()}
@@ -4,10 +4,13 @@ import re
 
 from curl_cffi.requests import AsyncSession
 
-from app.adapters.base import BaseAdapter
+from app.adapters.base import AdapterBlockedError, AdapterError, BaseAdapter
+from app.adapters.http import new_curl_session
+from app.adapters.throttle import AdapterThrottledError, get_throttle
 from app.models.schemas import ProductResult, Platform
 from app.config import get_settings
-from app.utils.text import clean_price, extract_brand, compute_discount
+from app.utils.features import text_features
+from app.utils.text import clean_price, compute_discount
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -20,6 +23,23 @@ class TiraAdapter(BaseAdapter):
     APP_TOKEN = "ikdiQv6tj"
     API_URL = "https://api.tirabeauty.com/service/application/catalog/v1.0/products/"
 
+    def __init__(self) -> None:
+        self._session: AsyncSession | None = None
+
+    async def start(self) -> None:
+        self.get_session()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def get_session(self) -> AsyncSession:
+        """Return the shared pooled session, creating it on first use."""
+        if self._session is None:
+            self._session = new_curl_session()
+        return self._session
+
     @property
     def platform(self) -> Platform:
         return Platform.TIRA
@@ -37,37 +57,42 @@ class TiraAdapter(BaseAdapter):
         return f"Bearer {token}"
 
     async def search(self, query: str, limit: int = 10) -> list[ProductResult]:
-        results: list[ProductResult] = []
         try:
-            async with AsyncSession(impersonate="chrome131") as s:
-                headers = {
-                    "Accept": "application/json",
-                    "Authorization": self._auth_header(),
-                }
-                resp = await s.get(
+            headers = {
+                "Accept": "application/json",
+                "Authorization": self._auth_header(),
+            }
+            async with get_throttle(self.platform.value).slot():
+                resp = await self.get_session().get(
                     self.API_URL,
                     params={"q": query, "page_size": limit},
                     headers=headers,
                     timeout=settings.request_timeout,
                 )
-                if resp.status_code != 200:
-                    logger.warning(f"Tira API returned {resp.status_code}")
-                    return []
-
-                data = resp.json()
-                items = data.get("items", [])
-
-                for item in items[:limit]:
-                    try:
-                        result = self._parse_product(item)
-                        if result:
-                            results.append(result)
-                    except Exception as e:
-                        logger.warning(f"Tira: failed to parse product: {e}")
-                        continue
-
+        except AdapterThrottledError:
+            raise
         except Exception as e:
-            logger.error(f"Tira: unexpected error: {e}")
+            raise AdapterError(f"Tira: request failed: {e}") from e
+
+        if resp.status_code in (403, 429):
+            raise AdapterBlockedError(f"Tira API returned {resp.status_code}")
+        if resp.status_code != 200:
+            raise AdapterError(f"Tira API returned {resp.status_code}")
+
+        try:
+            items = resp.json().get("items", [])
+        except ValueError as e:
+            raise AdapterError(f"Tira: invalid JSON: {e}") from e
+
+        results: list[ProductResult] = []
+        for item in items[:limit]:
+            try:
+                result = self._parse_product(item)
+                if result:
+                    results.append(result)
+            except Exception as e:
+                logger.warning(f"Tira: failed to parse product: {e}")
+                continue
 
         return results
 
@@ -93,7 +118,7 @@ class TiraAdapter(BaseAdapter):
         brand_data = item.get("brand", {})
         brand = brand_data.get("name", "") if isinstance(brand_data, dict) else str(brand_data)
         if not brand:
-            brand = extract_brand(name)
+            brand = text_features(name).brand
 
         # Image from medias array
         image_url = ""
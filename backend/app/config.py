@@ -19,18 +19,127 @@ class Settings(BaseSettings):
     ]
 
     # Cache
-    cache_ttl_seconds: int = 7200  # 2 hours
+    cache_ttl_seconds: int = 7200  # 2 hours, hard TTL: entries are dropped after this
+    cache_soft_ttl_seconds: int = 1800  # after this, serve stale and refresh in background
     cache_max_size: int = 500
+    cache_refresh_concurrency: int = 2  # max background refreshes at once
+    # Raw per-platform results; Amazon prices move fastest
+    platform_cache_ttl_seconds: dict[str, int] = {
+        "amazon": 1800,
+        "nykaa": 3600,
+        "tira": 7200,
+    }
+    # Shared L2 tier: Redis if a URL is set, else a SQLite file ("" disables L2)
+    cache_redis_url: str = ""
+    cache_l2_path: str = "./beautycompare_cache.db"
 
     # Scraping
     request_timeout: int = 15  # seconds per adapter
     max_retries: int = 2
+
+    # Latency-aware fan-out
+    latency_window: int = 200  # recent calls kept per platform
+    latency_min_samples: int = 20  # before adaptive deadlines/hedging kick in
+    adaptive_timeout_multiplier: float = 2.0  # per-platform deadline = p99 * this
+    adaptive_timeout_min: float = 3.0  # seconds; never cut a platform off sooner
+    hedge_requests: bool = True  # send a duplicate call once one passes its p95
+    search_response_budget_ms: int = 0  # return partial results after this; 0 = off
+
+    # Circuit breakers (one per platform)
+    breaker_window: int = 20  # recent live calls considered
+    breaker_min_calls: int = 5  # before the failure rate can trip the breaker
+    breaker_failure_rate: float = 0.5  # trip when this share of recent calls failed
+    breaker_open_seconds: int = 30  # fail fast this long before a half-open probe
+
+    # Outbound throttling per platform (token bucket + in-flight cap)
+    outbound_rate_limit: float = 2.0  # requests per second
+    outbound_burst: int = 3  # requests allowed back to back after a quiet spell
+    outbound_concurrency: int = 4  # requests in flight at once
+    # Per-platform overrides; Amazon blocks bursts soonest. Nykaa autocomplete
+    # has its own smaller budget so typing never holds up Nykaa searches
+    platform_rate_limits: dict[str, float] = {
+        "amazon": 1.0, "nykaa": 2.0, "tira": 4.0, "nykaa_suggest": 1.0,
+    }
+    platform_concurrency: dict[str, int] = {
+        "amazon": 2, "nykaa": 4, "tira": 6, "nykaa_suggest": 2,
+    }
+
+    # Outbound connection pools (one long-lived pool per adapter)
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry: int = 60  # seconds an idle connection stays open
+    http2: bool = True  # used when the client library supports it
     user_agent: str = (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
         "AppleWebKit/537.36 (KHTML, like Gecko) "
         "Chrome/131.0.0.0 Safari/537.36"
     )
 
+    # CPU-bound work (HTML parsing, matching) runs off the event loop
+    cpu_executor: str = "thread"  # "thread" or "process"
+    cpu_workers: int = 4
+    cpu_queue_size: int = 32  # jobs waiting beyond this block their callers
+
+    # Matching
+    matcher_mode: str = "greedy"  # "greedy" or "optimal" (one listing per platform per group)
+    # Threads per rapidfuzz cdist call. Matching already runs on the CPU
+    # executor, one call per worker, so more threads oversubscribe the cores
+    matcher_workers: int = 1
+
+    # Autocomplete
+    suggestion_deadline_ms: int = 150  # answer with whichever sources are ready by then
+    suggestion_remote_timeout: float = 3.0  # seconds; late remote answers still fill the cache
+    suggestion_pool_size: int = 30  # candidates cached per prefix, filtered for longer queries
+    suggestion_cache_size: int = 2000  # prefixes kept
+    suggestion_cache_ttl_seconds: int = 1800
+    suggestion_negative_ttl_seconds: int = 60  # empty results expire sooner
+    # Harvested names kept (oldest dropped); ~0.5 s to build and sub-ms
+    # lookups at this size (benchmarks/bench_suggestions.py)
+    suggestion_index_max_terms: int = 10000
+    suggestion_index_rebuild_after: int = 200  # new harvested names before a rebuild
+    suggestion_index_rebuild_interval: int = 300  # seconds; at most one rebuild per interval
+
+    # Query canonicalization: spelling/order/unit variants share one cache key
+    canonicalize_queries: bool = True  # False: keys only fold case, accents and punctuation
+    canonical_spelling_cutoff: float = 85  # rapidfuzz ratio a correction must reach
+
+    # Search logging (write-behind, batched)
+    log_batch_size: int = 200  # rows per insert
+    log_flush_seconds: float = 2.0  # flush a partial batch after this
+    log_queue_size: int = 10000  # rows buffered; beyond this new rows are dropped
+
+    # Price history (write-behind: canonical products + price records)
+    persist_prices: bool = True
+    history_batch_size: int = 50  # platform result lists per flush
+    history_flush_seconds: float = 5.0
+    history_queue_size: int = 2000
+
+    # Price history rollups (periodic compaction of price_records)
+    rollup_interval_seconds: int = 600
+    rollup_chunk_size: int = 5000  # raw records folded per transaction
+    rollup_settle_seconds: float = 30  # longer than any price-history write transaction
+    raw_price_retention_days: int = 30  # older raw rows are dropped once rolled up
+
+    # Prewarming: keep the busiest queries' cached responses fresh
+    prewarm_enabled: bool = True
+    prewarm_max_queries: int = 100  # curated terms + most searched, busiest first
+    prewarm_log_days: int = 7  # search log window used to rank queries
+    prewarm_limit: int = 10  # results per platform warmed (the /search default)
+    prewarm_lead_seconds: int = 300  # refresh this long before the soft TTL
+    prewarm_jitter_seconds: int = 120  # random extra lead, spreads refreshes out
+    prewarm_retry_seconds: int = 300  # after a failed or partial refresh
+    prewarm_reload_seconds: int = 3600  # re-rank the query list
+    prewarm_start_delay_seconds: int = 30  # let startup settle before warming
+    # Concurrent prewarm calls per platform, on top of user traffic
+    prewarm_platform_concurrency: dict[str, int] = {"amazon": 1, "nykaa": 2, "tira": 2}
+
+    # Catalog tier: answer from stored products + latest prices before scraping
+    catalog_enabled: bool = True
+    catalog_fresh_seconds: int = 900  # prices this recent are served alone
+    catalog_max_age_seconds: int = 86400  # up to this, served and refreshed in background
+    catalog_min_platforms: int = 2  # fewer platforms covered -> search live instead
+    catalog_candidates: int = 100  # products fetched from the full-text index
+
     # Rate limiting
     rate_limit: str = "10/minute"
 
@@ -1,4 +1,5 @@
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -7,18 +8,56 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
 from app.config import get_settings
-from app.routers import search
+from app.routers import products, search
 from app.models.database import init_db
+from app.services import cache
+from app.services.catalog import init_catalog
+from app.services.executor import cpu_executor
+from app.services.price_history import price_writer
+from app.services.prewarm import prewarmer
+from app.services.refresh import refresher
+from app.services.rollups import rollup_compactor
+from app.services.search_log import search_log_writer
+from app.services.search import start_adapters, close_adapters, get_platform_health
+from app.services.suggestion_index import suggestion_index
+from app.services.suggestions import build_suggestion_index, close_suggestions
 
 logging.basicConfig(level=logging.INFO)
 settings = get_settings()
 
 limiter = Limiter(key_func=get_remote_address)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_db()
+    await init_catalog()
+    cpu_executor.start()
+    cache.start()
+    search_log_writer.start()
+    price_writer.start()
+    rollup_compactor.start()
+    await start_adapters()
+    await build_suggestion_index()
+    prewarmer.start()
+    yield
+    await prewarmer.close()
+    await refresher.close()
+    await suggestion_index.close()
+    await close_suggestions()
+    await search_log_writer.close()
+    await price_writer.close()
+    await rollup_compactor.close()
+    await close_adapters()
+    await cache.close()
+    cpu_executor.shutdown()
+
+
 app = FastAPI(
     title=settings.app_name,
     description="Compare beauty product prices across Nykaa, Tira & Amazon India",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.state.limiter = limiter
@@ -37,13 +76,15 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 # Routers
 app.include_router(search.router, prefix="/api")
-
-
-@app.on_event("startup")
-async def startup():
-    await init_db()
+app.include_router(products.router, prefix="/api")
 
 
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy", "app": settings.app_name}
+    platforms = get_platform_health()
+    degraded = any(p["state"] != "closed" for p in platforms.values())
+    return {
+        "status": "degraded" if degraded else "healthy",
+        "app": settings.app_name,
+        "platforms": platforms,
+    }
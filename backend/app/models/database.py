@@ -1,11 +1,17 @@
+import logging
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import (
+    Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Index, UniqueConstraint,
+    inspect, text,
+)
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, relationship
 
 from app.config import get_settings
+from app.utils.text import normalize_text
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 _engine_kwargs: dict = {"echo": settings.debug}
@@ -24,11 +30,17 @@ class Base(DeclarativeBase):
 
 class Product(Base):
     __tablename__ = "products"
+    # One canonical row per normalized name + brand + size
+    __table_args__ = (
+        UniqueConstraint("normalized_name", "brand", "size", name="uq_products_canonical"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(500), nullable=False)
-    brand = Column(String(200), default="")
+    brand = Column(String(200), default="")  # normalized (lowercase)
     normalized_name = Column(String(500), index=True)
+    size = Column(String(50), default="")  # e.g. "30ml", "" if unknown
+    image_url = Column(Text, default="")
     created_at = Column(DateTime, default=datetime.utcnow)
 
     prices = relationship("PriceRecord", back_populates="product")
@@ -36,6 +48,10 @@ class Product(Base):
 
 class PriceRecord(Base):
     __tablename__ = "price_records"
+    # Price history lookups: one product on one platform, newest first
+    __table_args__ = (
+        Index("ix_price_records_product_platform_time", "product_id", "platform", "scraped_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
@@ -50,17 +66,126 @@ class PriceRecord(Base):
     product = relationship("Product", back_populates="prices")
 
 
+class PriceRollup(Base):
+    """Min/max/avg price per product, platform and day or week bucket."""
+
+    __tablename__ = "price_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "product_id", "platform", "period", "bucket_start", name="uq_price_rollups_bucket"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    platform = Column(String(50), nullable=False)
+    period = Column(String(10), nullable=False)  # "day" or "week"
+    bucket_start = Column(DateTime, nullable=False)  # UTC midnight (Monday for weeks)
+    min_price = Column(Float, nullable=False)
+    max_price = Column(Float, nullable=False)
+    sum_price = Column(Float, nullable=False)  # avg = sum_price / samples
+    samples = Column(Integer, nullable=False)
+
+
+class RollupState(Base):
+    """Compaction watermark: PriceRecord ids up to this are in the rollups."""
+
+    __tablename__ = "rollup_state"
+
+    name = Column(String(50), primary_key=True)
+    last_record_id = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
 class SearchLog(Base):
     __tablename__ = "search_logs"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     query = Column(String(500), nullable=False, index=True)
+    canonical_query = Column(String(500), index=True)  # groups spelling/order variants
     results_count = Column(Integer, default=0)
     response_time_ms = Column(Integer, default=0)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
 
+def _add_missing_columns(conn) -> None:
+    """Add nullable columns introduced since an existing table was created."""
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+
+def _merge_duplicate_products(conn) -> None:
+    """
+    Normalize brands and sizes of products from older versions, then fold
+    products sharing a canonical identity into the oldest one, moving their
+    price records over, so the unique index can be built.
+    """
+    keep: dict[tuple, int] = {}
+    moves: list[tuple[int, int]] = []  # (duplicate id, kept id)
+    renames: list[dict] = []
+    rows = conn.execute(text("SELECT id, normalized_name, brand, size FROM products ORDER BY id"))
+    for row in rows:
+        # Older rows stored brands as scraped and had no size (NULLs never conflict)
+        identity = (row.normalized_name, normalize_text(row.brand or ""), row.size or "")
+        if identity in keep:
+            moves.append((row.id, keep[identity]))
+            continue
+        keep[identity] = row.id
+        if (row.brand, row.size) != identity[1:]:
+            renames.append({"id": row.id, "brand": identity[1], "size": identity[2]})
+    if renames:
+        conn.execute(text("UPDATE products SET brand = :brand, size = :size WHERE id = :id"), renames)
+    if not moves:
+        return
+
+    params = [{"duplicate": duplicate, "kept": kept} for duplicate, kept in moves]
+    conn.execute(
+        text("UPDATE price_records SET product_id = :kept WHERE product_id = :duplicate"), params
+    )
+    conn.execute(text("DELETE FROM products WHERE id = :duplicate"), params)
+    logger.info(f"Merged {len(moves)} duplicate products")
+
+
+def _upgrade_schema(conn) -> None:
+    """
+    Bring tables created by older versions up to the current models:
+    new nullable columns, the canonical-product unique index (after
+    merging duplicates) and the price history index. create_all() only
+    creates missing tables.
+    """
+    _add_missing_columns(conn)
+
+    inspector = inspect(conn)
+    canonical = ["normalized_name", "brand", "size"]
+    unique_sets = [c["column_names"] for c in inspector.get_unique_constraints("products")]
+    unique_sets += [i["column_names"] for i in inspector.get_indexes("products") if i["unique"]]
+    if canonical not in unique_sets:
+        _merge_duplicate_products(conn)
+        conn.execute(
+            text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_products_canonical "
+                "ON products (normalized_name, brand, size)"
+            )
+        )
+        logger.info("Upgraded products: merged duplicates and added uq_products_canonical")
+
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_price_records_product_platform_time "
+            "ON price_records (product_id, platform, scraped_at)"
+        )
+    )
+
+
 async def init_db():
-    """Create all tables."""
+    """Create all tables and upgrade ones created by older versions."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_upgrade_schema)
@@ -47,6 +47,47 @@ class SearchResponse(BaseModel):
     total_results: int = 0
     platforms_searched: list[str] = []
     platforms_failed: list[str] = []
+    platforms_pending: list[str] = Field(
+        [], description="Platforms still running when the response budget ran out"
+    )
     cached: bool = False
+    source: str = Field("live", description="Where the answer came from: live, cache or catalog")
+    stale: bool = Field(False, description="Served from cache past its soft TTL; a refresh is running")
+    cache_age_seconds: int = Field(0, description="Age of the served data (oldest price for catalog)")
     search_time_ms: int = 0
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
+class PlatformResults(BaseModel):
+    """Streamed when one platform's results arrive."""
+
+    platform: str
+    results: list[ProductResult] = []
+    failed: bool = False
+
+
+class MatchUpdate(BaseModel):
+    """Streamed after each platform: the products regrouped so far."""
+
+    results: list[MatchedProduct] = []
+    platforms_searched: list[str] = []
+
+
+class PriceBucket(BaseModel):
+    """Price statistics for one platform over one day or week."""
+
+    bucket_start: datetime
+    min_price: float
+    max_price: float
+    avg_price: float
+    samples: int
+
+
+class PriceHistory(BaseModel):
+    """Bucketed price history of a stored product, per platform."""
+
+    product_id: int
+    name: str
+    brand: str = ""
+    period: str
+    platforms: dict[str, list[PriceBucket]] = {}
@@ -0,0 +1,43 @@
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Path, Query, Request
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from app.models.schemas import PriceHistory
+from app.services.rollups import get_price_histories
+
+limiter = Limiter(key_func=get_remote_address)
+router = APIRouter(tags=["products"])
+
+# Most products one batch history request may ask for
+MAX_BATCH_IDS = 50
+
+
+@router.get("/products/history", response_model=list[PriceHistory])
+@limiter.limit("30/minute")
+async def batch_price_history(
+    request: Request,
+    ids: list[int] = Query(..., description="Product ids, e.g. ?ids=1&ids=2"),
+    period: Literal["day", "week"] = Query("day", description="Bucket size"),
+    days: int = Query(365, ge=1, le=1825, description="How far back to look"),
+):
+    """Price history of several stored products; unknown ids are left out."""
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    return await get_price_histories(list(dict.fromkeys(ids)), period=period, days=days)
+
+
+@router.get("/products/{product_id}/history", response_model=PriceHistory)
+@limiter.limit("30/minute")
+async def price_history(
+    request: Request,
+    product_id: int = Path(..., ge=1),
+    period: Literal["day", "week"] = Query("day", description="Bucket size"),
+    days: int = Query(365, ge=1, le=1825, description="How far back to look"),
+):
+    """Min, max and average price per platform for one stored product."""
+    histories = await get_price_histories([product_id], period=period, days=days)
+    if not histories:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return histories[0]
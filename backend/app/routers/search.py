@@ -1,15 +1,37 @@
+import asyncio
+
 from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-from app.models.schemas import SearchResponse
-from app.services.search import search_products
+from app.adapters.throttle import get_throttle_stats
+from app.models.schemas import MatchUpdate, PlatformResults, SearchResponse
+from app.services.search import (
+    get_inflight_stats,
+    get_platform_health,
+    search_products,
+    stream_search,
+)
 from app.services.cache import get_cache_stats
-from app.services.suggestions import get_suggestions, get_trending
+from app.services.catalog import get_catalog_stats
+from app.services.executor import cpu_executor
+from app.services.latency import latency
+from app.services.suggestion_index import suggestion_index
+from app.utils.features import feature_cache_stats
+from app.services.price_history import price_writer
+from app.services.prewarm import prewarmer
+from app.services.refresh import refresher
+from app.services.rollups import rollup_compactor
+from app.services.search_log import search_log_writer
+from app.services.suggestions import get_suggestion_cache_stats, get_suggestions, get_trending
 
 limiter = Limiter(key_func=get_remote_address)
 router = APIRouter(tags=["search"])
 
+# How often a pending suggestions request checks for a gone client
+DISCONNECT_POLL_SECONDS = 0.05
+
 
 @router.get("/search", response_model=SearchResponse)
 @limiter.limit("10/minute")
@@ -23,6 +45,35 @@ async def search(
     return response
 
 
+@router.get("/search/stream")
+@limiter.limit("10/minute")
+async def search_stream(
+    request: Request,
+    q: str = Query(..., min_length=2, max_length=200, description="Search query"),
+    limit: int = Query(10, ge=1, le=30, description="Max results per platform"),
+):
+    """
+    Server-Sent Events version of /search.
+
+    Emits a `platform` event per platform as it answers, a `matches` event
+    with the regrouped products after each, and the final SearchResponse as
+    `done`.
+    """
+    event_names = {PlatformResults: "platform", MatchUpdate: "matches", SearchResponse: "done"}
+
+    async def events():
+        async for payload in stream_search(query=q, limit=limit):
+            if await request.is_disconnected():
+                break
+            yield f"event: {event_names[type(payload)]}\ndata: {payload.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/suggestions")
 @limiter.limit("30/minute")
 async def suggestions(
@@ -32,23 +83,53 @@ async def suggestions(
     """Return autocomplete suggestions for a partial query."""
     if not q.strip():
         return {"suggestions": get_trending()}
-    results = await get_suggestions(query=q)
-    return {"suggestions": results}
+    task = asyncio.create_task(get_suggestions(query=q))
+    # Typing clients abandon requests constantly; stop their remote lookups
+    while not task.done():
+        await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+        if not task.done() and await request.is_disconnected():
+            task.cancel()
+            return {"suggestions": []}
+    return {"suggestions": task.result()}
 
 
 @router.get("/platforms")
 async def get_platforms():
-    """List all supported platforms."""
-    return {
-        "platforms": [
-            {"id": "nykaa", "name": "Nykaa", "color": "#FC2779", "url": "https://www.nykaa.com"},
-            {"id": "amazon", "name": "Amazon India", "color": "#FF9900", "url": "https://www.amazon.in"},
-            {"id": "tira", "name": "Tira Beauty", "color": "#000000", "url": "https://www.tirabeauty.com"},
-        ]
-    }
+    """List all supported platforms with their circuit-breaker status."""
+    health = get_platform_health()
+    platforms = [
+        {"id": "nykaa", "name": "Nykaa", "color": "#FC2779", "url": "https://www.nykaa.com"},
+        {"id": "amazon", "name": "Amazon India", "color": "#FF9900", "url": "https://www.amazon.in"},
+        {"id": "tira", "name": "Tira Beauty", "color": "#000000", "url": "https://www.tirabeauty.com"},
+    ]
+    for platform in platforms:
+        platform["status"] = health[platform["id"]]["state"]
+    return {"platforms": platforms}
 
 
 @router.get("/cache-stats")
 async def cache_stats():
-    """Return cache statistics."""
-    return get_cache_stats()
+    """Return cache, background-refresh and request-coalescing statistics."""
+    return {
+        **get_cache_stats(),
+        "catalog": get_catalog_stats(),
+        "refresh": refresher.stats(),
+        "prewarm": prewarmer.stats(),
+        "inflight": get_inflight_stats(),
+    }
+
+
+@router.get("/stats")
+async def runtime_stats():
+    """Return runtime statistics for background machinery."""
+    return {
+        "cpu_executor": cpu_executor.stats(),
+        "platform_latency": latency.stats(),
+        "outbound_throttle": get_throttle_stats(),
+        "text_features": feature_cache_stats(),
+        "suggestion_index": suggestion_index.stats(),
+        "suggestion_cache": get_suggestion_cache_stats(),
+        "search_log": search_log_writer.stats(),
+        "price_history": price_writer.stats(),
+        "price_rollups": rollup_compactor.stats(),
+    }
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BatchWriter(Generic[T]):
+    """
+    Write-behind buffer: callers submit items without waiting, a background
+    task flushes them in batches when max_batch items are queued or
+    flush_interval seconds have passed since the first one.
+
+    The queue is bounded; when it is full new items are dropped and
+    counted rather than slowing down the request that produced them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[list[T]], Awaitable[None]],
+        max_batch: int = 100,
+        flush_interval: float = 2.0,
+        max_queue: int = 10000,
+    ):
+        self.name = name
+        self._flush = flush
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._queue: asyncio.Queue[T] | None = None  # created by start(), on the running loop
+        self._pending: list[T] = []  # taken off the queue, not yet written
+        self._task: asyncio.Task | None = None
+        self._writing: asyncio.Future | None = None
+        self._closing = False
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._batches = 0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.create_task(self._run(), name=f"batch-writer-{self.name}")
+
+    def submit(self, item: T) -> bool:
+        """Queue an item for the next batch; False if it was dropped."""
+        if self._closing or self._queue is None:
+            self._dropped += 1
+            return False
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._dropped += 1
+            if self._dropped % 1000 == 1:
+                logger.warning(f"{self.name}: write queue full, dropped {self._dropped} so far")
+            return False
+        return True
+
+    async def _fill_batch(self) -> None:
+        """Wait for one item, then gather more until the batch is full or due."""
+        self._pending.append(await self._queue.get())
+        loop = asyncio.get_running_loop()
+        due = loop.time() + self.flush_interval
+        while len(self._pending) < self.max_batch:
+            remaining = due - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                self._pending.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _write(self, batch: list[T]) -> None:
+        try:
+            await self._flush(batch)
+        except Exception as e:
+            self._failed += len(batch)
+            logger.error(f"{self.name}: failed to write {len(batch)} items - {e}")
+            return
+        self._written += len(batch)
+        self._batches += 1
+
+    async def _run(self) -> None:
+        # Checked as well as cancelled: wait_for() can swallow a cancellation
+        # that lands as a queued item arrives, leaving the loop running
+        while not self._closing:
+            await self._fill_batch()
+            batch, self._pending = self._pending, []
+            # Shielded so shutdown lets a batch already being written finish
+            self._writing = asyncio.ensure_future(self._write(batch))
+            await asyncio.shield(self._writing)
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Stop accepting items, flush what is queued and stop the task."""
+        self._closing = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        async def _flush_remaining() -> None:
+            if self._writing is not None:
+                await self._writing
+            while self._queue is not None and not self._queue.empty():
+                self._pending.append(self._queue.get_nowait())
+            for i in range(0, len(self._pending), self.max_batch):
+                await self._write(self._pending[i : i + self.max_batch])
+            self._pending = []
+
+        try:
+            await asyncio.wait_for(_flush_remaining(), timeout=timeout)
+        except asyncio.TimeoutError:
+            lost = len(self._pending) + (self._queue.qsize() if self._queue else 0)
+            self._dropped += lost
+            logger.warning(f"{self.name}: shutdown flush timed out, dropped {lost} items")
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "written": self._written,
+            "dropped": self._dropped,
+            "failed": self._failed,
+            "batches": self._batches,
+        }
@@ -0,0 +1,125 @@
+import logging
+import time
+from collections import deque
+from enum import Enum
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """The platform's breaker is open; the call was skipped."""
+
+
+class CircuitBreaker:
+    """
+    Per-platform circuit breaker over the last `window` live calls.
+
+    Trips open when the failure share reaches `failure_rate` (after
+    `min_calls` calls) or at once when the platform blocks us. While open,
+    calls are refused; after `open_seconds` one probe is let through
+    (half-open) and its outcome closes or re-opens the breaker.
+
+    Outcomes: "ok", or a failure kind: "error", "timeout", "blocked",
+    "empty" (a soft failure: the platform answered with nothing).
+    """
+
+    def __init__(
+        self, name: str, window: int, min_calls: int, failure_rate: float, open_seconds: int
+    ) -> None:
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.state = BreakerState.CLOSED
+        self._outcomes: deque[str] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._trips = 0
+        self._rejected = 0
+
+    def allow(self) -> bool:
+        """Whether a live call may go out now."""
+        if self.state == BreakerState.OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self._rejected += 1
+                return False
+            self.state = BreakerState.HALF_OPEN
+            logger.info(f"{self.name}: circuit half-open, probing")
+        if self.state == BreakerState.HALF_OPEN:
+            if self._probe_in_flight:
+                self._rejected += 1
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record(self, outcome: str) -> None:
+        if outcome == "throttled":
+            # Our own outbound budget said no; says nothing about the platform
+            self._probe_in_flight = False
+            return
+        if self.state == BreakerState.HALF_OPEN:
+            self._probe_in_flight = False
+            if outcome == "ok":
+                logger.info(f"{self.name}: circuit closed")
+                self.state = BreakerState.CLOSED
+                self._outcomes.clear()
+            else:
+                self._trip(f"probe failed ({outcome})")
+            return
+
+        self._outcomes.append(outcome)
+        if self.state != BreakerState.CLOSED:
+            return
+        if outcome == "blocked":
+            self._trip("blocked by platform")
+        elif len(self._outcomes) >= self.min_calls and self._failure_share() >= self.failure_rate:
+            self._trip(f"{self._failure_share():.0%} of recent calls failed")
+
+    def _failure_share(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(o != "ok" for o in self._outcomes) / len(self._outcomes)
+
+    def _trip(self, reason: str) -> None:
+        logger.warning(f"{self.name}: circuit open for {self.open_seconds}s - {reason}")
+        self.state = BreakerState.OPEN
+        self._opened_at = time.monotonic()
+        self._trips += 1
+
+    def snapshot(self) -> dict:
+        retry_in = 0
+        if self.state == BreakerState.OPEN:
+            retry_in = max(0, round(self.open_seconds - (time.monotonic() - self._opened_at)))
+        return {
+            "state": self.state.value,
+            "failure_rate": round(self._failure_share(), 2),
+            "recent_calls": len(self._outcomes),
+            "trips": self._trips,
+            "rejected": self._rejected,
+            "retry_in_seconds": retry_in,
+        }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(platform: str) -> CircuitBreaker:
+    """Return the breaker for a platform, creating it on first use."""
+    if platform not in _breakers:
+        _breakers[platform] = CircuitBreaker(
+            platform,
+            window=settings.breaker_window,
+            min_calls=settings.breaker_min_calls,
+            failure_rate=settings.breaker_failure_rate,
+            open_seconds=settings.breaker_open_seconds,
+        )
+    return _breakers[platform]
@@ -1,65 +1,330 @@
 import hashlib
 import logging
+import struct
+import time
+import zlib
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
 from cachetools import TTLCache
+from pydantic import TypeAdapter
 
 from app.config import get_settings
-from app.models.schemas import SearchResponse
+from app.models.schemas import ProductResult, SearchResponse
+from app.services.cache_backends import CacheBackend, create_l2_backend
+from app.services.canonical import canonical_key, get_canonical_stats
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-# Global in-memory cache
-_cache: TTLCache = TTLCache(
+T = TypeVar("T")
+
+# L2 values: 8-byte store timestamp + zlib-compressed JSON
+_HEADER = struct.Struct("<d")
+
+
+class _TieredCache(Generic[T]):
+    """
+    Per-process L1 TTLCache of (stored_at, value) in front of a shared L2.
+
+    L2 hits fill L1. Values are serialized only for L2, so L1 hits cost a
+    dict lookup.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        maxsize: int,
+        ttl: int,
+        l2: CacheBackend | None,
+        dump: Callable[[T], bytes],
+        load: Callable[[bytes], T],
+    ) -> None:
+        self.namespace = namespace
+        self.l1: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.l2 = l2
+        self._dump = dump
+        self._load = load
+        self.stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0}
+
+    def _l2_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def _get_l2(self, key: str, max_age: float) -> tuple[float, T] | None:
+        if self.l2 is None:
+            return None
+        try:
+            blob = await self.l2.get(self._l2_key(key))
+            if blob is None:
+                return None
+            (stored_at,) = _HEADER.unpack_from(blob)
+            if time.time() - stored_at >= max_age:
+                return None
+            return stored_at, self._load(zlib.decompress(blob[_HEADER.size:]))
+        except Exception as e:
+            logger.warning(f"L2 cache ({self.l2.name}) read failed: {e}")
+            return None
+
+    async def get(
+        self, key: str, max_age: float | None = None, count: bool = True
+    ) -> tuple[float, T] | None:
+        """
+        Return (stored_at, value) younger than max_age (default: the L1 TTL).
+
+        count=False reads without touching the hit/miss statistics, for
+        internal probes that are not user lookups.
+        """
+        max_age = self.l1.ttl if max_age is None else max_age
+        entry = self.l1.get(key)
+        if entry is not None and time.time() - entry[0] < max_age:
+            if count:
+                self.stats["l1_hits"] += 1
+            return entry
+        entry = await self._get_l2(key, max_age)
+        if entry is None:
+            if count:
+                self.stats["misses"] += 1
+            return None
+        if count:
+            self.stats["l2_hits"] += 1
+        self.l1[key] = entry
+        return entry
+
+    async def set(self, key: str, value: T, ttl: int) -> None:
+        """Store value in L1 and write it through to L2."""
+        stored_at = time.time()
+        self.l1[key] = (stored_at, value)
+        if self.l2 is None:
+            return
+        try:
+            blob = _HEADER.pack(stored_at) + zlib.compress(self._dump(value))
+            await self.l2.set(self._l2_key(key), blob, ttl)
+        except Exception as e:
+            logger.warning(f"L2 cache ({self.l2.name}) write failed: {e}")
+
+    def get_stats(self) -> dict:
+        hits = self.stats["l1_hits"] + self.stats["l2_hits"]
+        total = hits + self.stats["misses"]
+        return {
+            "size": len(self.l1),
+            "max_size": self.l1.maxsize,
+            "hits": hits,
+            "misses": self.stats["misses"],
+            "hit_rate_percent": _rate(hits, total),
+            "l1": {
+                "hits": self.stats["l1_hits"],
+                "hit_rate_percent": _rate(self.stats["l1_hits"], total),
+            },
+            "l2": {
+                "backend": self.l2.name if self.l2 else None,
+                "hits": self.stats["l2_hits"],
+                "hit_rate_percent": _rate(self.stats["l2_hits"], total - self.stats["l1_hits"]),
+            },
+        }
+
+    def clear(self) -> None:
+        self.l1.clear()
+        for name in self.stats:
+            self.stats[name] = 0
+
+
+def _rate(hits: int, lookups: int) -> float:
+    return round(hits / lookups * 100, 1) if lookups > 0 else 0
+
+
+# Platform entries remember the limit they were fetched with
+_platform_entry = TypeAdapter(tuple[int, list[ProductResult]])
+
+# Shared by every worker (SQLite on disk, or Redis when configured). Opened
+# by start(), so importing this module never creates a cache file
+_l2: CacheBackend | None = None
+
+# Merged search responses. Entries live until the hard TTL; past the soft
+# TTL they are still served but flagged stale.
+_responses: _TieredCache[SearchResponse] = _TieredCache(
+    "search",
     maxsize=settings.cache_max_size,
     ttl=settings.cache_ttl_seconds,
+    l2=None,
+    dump=lambda r: r.model_dump_json().encode(),
+    load=SearchResponse.model_validate_json,
+)
+
+# Raw results per platform as (fetched limit, results), each platform with
+# its own TTL. One entry per (platform, query) serves every limit up to the
+# one it was fetched with.
+_platforms: _TieredCache[tuple[int, list[ProductResult]]] = _TieredCache(
+    "platform",
+    maxsize=settings.cache_max_size * 3,
+    ttl=max(settings.platform_cache_ttl_seconds.values(), default=settings.cache_ttl_seconds),
+    l2=None,
+    dump=_platform_entry.dump_json,
+    load=_platform_entry.validate_json,
 )
 
-# Stats
-_stats = {"hits": 0, "misses": 0}
+_stale_hits = 0
+_superset_hits = 0
+_canonical_hits = 0
+
+
+def make_key(query: str) -> str:
+    """Create a cache key from a search query's canonical form."""
+    return hashlib.md5(canonical_key(query).encode()).hexdigest()
+
+
+def _response_key(query: str, limit: int) -> str:
+    return f"{make_key(query)}:{limit}"
 
 
-def _make_key(query: str) -> str:
-    """Create a normalized cache key from a search query."""
-    normalized = query.lower().strip()
-    return hashlib.md5(normalized.encode()).hexdigest()
+def _platform_key(platform: str, query: str) -> str:
+    return f"{platform}:{make_key(query)}"
 
 
-def get_cached(query: str) -> SearchResponse | None:
-    """Retrieve cached search results if available."""
-    key = _make_key(query)
-    result = _cache.get(key)
-    if result is not None:
-        _stats["hits"] += 1
-        logger.debug(f"Cache HIT for query: {query}")
-        return result
-    _stats["misses"] += 1
-    logger.debug(f"Cache MISS for query: {query}")
-    return None
+async def get_cached(query: str, limit: int) -> SearchResponse | None:
+    """
+    Retrieve cached search results from L1, then L2 (filling L1 on an L2 hit).
 
+    Returns a copy marked cached, with its age, and stale=True once the entry
+    is older than the soft TTL.
+    """
+    global _stale_hits, _canonical_hits
+    entry = await _responses.get(_response_key(query, limit))
+    if entry is None:
+        logger.debug(f"Cache MISS for query: {query}")
+        return None
 
-def set_cached(query: str, response: SearchResponse) -> None:
-    """Store search results in cache."""
-    key = _make_key(query)
-    _cache[key] = response
+    stored_at, response = entry
+    age = time.time() - stored_at
+    stale = age >= settings.cache_soft_ttl_seconds
+    if stale:
+        _stale_hits += 1
+    if response.query.lower().strip() != query.lower().strip():
+        # Stored by a spelling/order variant: a miss under the old lowercase key
+        _canonical_hits += 1
+    logger.debug(f"Cache {'STALE ' if stale else ''}HIT for query: {query}")
+    return response.model_copy(
+        update={
+            "query": query,
+            "cached": True,
+            "source": "cache",
+            "stale": stale,
+            "cache_age_seconds": int(age),
+        }
+    )
+
+
+async def get_cached_age(query: str, limit: int) -> float | None:
+    """Age in seconds of the cached response, if any; not counted as a lookup."""
+    entry = await _responses.get(_response_key(query, limit), count=False)
+    return None if entry is None else time.time() - entry[0]
+
+
+async def set_cached(query: str, limit: int, response: SearchResponse) -> None:
+    """Store search results in L1 and write them through to L2."""
+    await _responses.set(_response_key(query, limit), response, settings.cache_ttl_seconds)
     logger.debug(f"Cached results for query: {query}")
 
 
+def platform_ttl(platform: str) -> int:
+    """How long one platform's raw results stay reusable."""
+    return settings.platform_cache_ttl_seconds.get(platform, settings.cache_ttl_seconds)
+
+
+async def get_platform_cached(
+    platform: str, query: str, limit: int, max_age: float | None = None
+) -> list[ProductResult] | None:
+    """
+    Retrieve one platform's raw results if younger than that platform's TTL
+    (and than max_age, when given).
+
+    An entry fetched with a limit >= the requested one is sliced; so is a
+    smaller one the platform could not fill, since a larger fetch would
+    return the same list.
+    """
+    global _superset_hits
+    ttl = platform_ttl(platform)
+    if max_age is not None:
+        if max_age <= 0:
+            return None
+        ttl = min(ttl, max_age)
+    entry = await _platforms.get(_platform_key(platform, query), ttl)
+    if entry is None:
+        return None
+    fetched_limit, results = entry[1]
+    if fetched_limit < limit and len(results) >= fetched_limit:
+        # Cached too few; the caller re-fetches at the larger limit, which
+        # then replaces this entry
+        return None
+    if fetched_limit != limit:
+        _superset_hits += 1
+    return results[:limit]
+
+
+async def set_platform_cached(
+    platform: str, query: str, limit: int, results: list[ProductResult]
+) -> None:
+    """
+    Store one platform's raw results under that platform's TTL, unless a
+    fresh entry fetched with a larger limit is cached: it serves this
+    limit too, and replacing it would force the larger fetch again.
+    """
+    ttl = platform_ttl(platform)
+    key = _platform_key(platform, query)
+    current = await _platforms.get(key, ttl, count=False)
+    if current is not None and current[1][0] > limit:
+        return
+    await _platforms.set(key, (limit, results), ttl)
+
+
 def get_cache_stats() -> dict:
-    """Return cache statistics."""
-    total = _stats["hits"] + _stats["misses"]
-    hit_rate = (_stats["hits"] / total * 100) if total > 0 else 0
+    """Return cache statistics, overall and per tier."""
+    responses = _responses.get_stats()
     return {
-        "size": len(_cache),
-        "max_size": _cache.maxsize,
-        "ttl_seconds": int(_cache.ttl),
-        "hits": _stats["hits"],
-        "misses": _stats["misses"],
-        "hit_rate_percent": round(hit_rate, 1),
+        **responses,
+        "ttl_seconds": settings.cache_ttl_seconds,
+        "soft_ttl_seconds": settings.cache_soft_ttl_seconds,
+        "stale_hits": _stale_hits,
+        # Hits only canonicalization made possible, and their share of all lookups
+        "canonical_hits": _canonical_hits,
+        "canonical_hit_rate_percent": _rate(
+            _canonical_hits, responses["hits"] + responses["misses"]
+        ),
+        "canonical": get_canonical_stats(),
+        "platforms": {
+            **_platforms.get_stats(),
+            "ttl_seconds": settings.platform_cache_ttl_seconds,
+            "superset_hits": _superset_hits,
+        },
     }
 
 
-def clear_cache() -> None:
-    """Clear all cached entries."""
-    _cache.clear()
-    _stats["hits"] = 0
-    _stats["misses"] = 0
+async def clear_cache() -> None:
+    """Clear all cached entries in both tiers."""
+    global _stale_hits, _superset_hits, _canonical_hits
+    _responses.clear()
+    _platforms.clear()
+    _stale_hits = 0
+    _superset_hits = 0
+    _canonical_hits = 0
+    if _l2 is not None:
+        await _l2.clear()
+
+
+def start() -> None:
+    """
+    Open the L2 backend behind both tiers. Called from the app lifespan;
+    until then (benchmarks, scripts) the cache is L1 only.
+    """
+    global _l2
+    if _l2 is None:
+        _l2 = create_l2_backend()
+        _responses.l2 = _platforms.l2 = _l2
+
+
+async def close() -> None:
+    """Release the L2 backend. Called from the app lifespan."""
+    global _l2
+    if _l2 is not None:
+        _responses.l2 = _platforms.l2 = None
+        await _l2.close()
+        _l2 = None
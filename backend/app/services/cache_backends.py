@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class CacheBackend(ABC):
+    """Shared (L2) cache store holding opaque bytes with a TTL."""
+
+    name: str = ""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    async def close(self) -> None:
+        """Cleanup resources. Override if backend holds connections."""
+        pass
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    On-disk L2 shared by every worker on the host.
+
+    Uses the stdlib sqlite3 driver in WAL mode; calls run in a thread so the
+    event loop never waits on disk.
+    """
+
+    name = "sqlite"
+    PURGE_EVERY = 200  # writes between expired-row sweeps
+
+    def __init__(self, path: str) -> None:
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._lock = threading.Lock()
+        self._writes = 0
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def _get(self, key: str) -> bytes | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: bytes, ttl: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+    def _clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    async def get(self, key: str) -> bytes | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisBackend(CacheBackend):
+    """L2 shared across hosts. Needs the optional `redis` package."""
+
+    name = "redis"
+    PREFIX = "bc:cache:"
+
+    def __init__(self, url: str) -> None:
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "CACHE_REDIS_URL is set but the 'redis' package is not installed"
+            ) from e
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._client.get(self.PREFIX + key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self._client.set(self.PREFIX + key, value, ex=ttl)
+
+    async def clear(self) -> None:
+        async for key in self._client.scan_iter(match=self.PREFIX + "*"):
+            await self._client.delete(key)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_l2_backend() -> CacheBackend | None:
+    """Pick the L2 backend from settings: Redis if configured, else SQLite, else none."""
+    if settings.cache_redis_url:
+        return RedisBackend(settings.cache_redis_url)
+    if settings.cache_l2_path:
+        return SQLiteBackend(settings.cache_l2_path)
+    return None
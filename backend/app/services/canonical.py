@@ -0,0 +1,221 @@
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from rapidfuzz import fuzz, process
+
+from app.config import get_settings
+from app.services.suggestion_index import SuggestionIndex, spelling_buckets, suggestion_index
+from app.utils.text import KNOWN_BRANDS
+
+settings = get_settings()
+
+_SYNONYMS_FILE = Path(__file__).resolve().parent.parent / "data" / "synonyms.txt"
+
+# Words, numbers and mixed tokens stay whole ("9to5", "24k", "30ml"); a
+# decimal point between digits is kept ("1.5")
+_TOKEN = re.compile(r"(?:[^\W_]*\d\.(?=\d))?[^\W_]+")
+# "30 ml", "30ML", "1.5 ltr", "50 gms" -> number + unit as one token
+_UNIT = re.compile(
+    r"\b(\d+(?:\.\d+)?)\s*(ml|mls|l|ltr|litre|liter|litres|liters|g|gm|gms|gram|grams|"
+    r"mg|kg|oz|fl oz)\b"
+)
+# "spf 50" -> "spf50"
+_SPF = re.compile(r"\bspf\s+(\d+)\b")
+# Apostrophes join rather than split words ("l'oreal" -> "loreal")
+_APOSTROPHES = str.maketrans("", "", "'\u2019\u02bc")
+_UNIT_ALIASES = {
+    "mls": "ml", "ltr": "l", "litre": "l", "liter": "l", "litres": "l", "liters": "l",
+    "gm": "g", "gms": "g", "gram": "g", "grams": "g", "fl oz": "oz",
+}
+
+# Tokens shorter than this are never spell-corrected ("me", "spf", "gel")
+_MIN_CORRECTABLE = 5
+
+
+def _load_synonyms() -> dict[str, str]:
+    """variant -> canonical phrase."""
+    synonyms: dict[str, str] = {}
+    for line in _SYNONYMS_FILE.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        canonical, _, variants = line.partition(":")
+        for variant in variants.split(","):
+            if variant.strip():
+                synonyms[variant.strip().lower()] = canonical.strip().lower()
+    return synonyms
+
+
+def _fold(query: str) -> str:
+    """Unicode-fold (compatibility forms, accents, case) and drop punctuation."""
+    text = unicodedata.normalize("NFKC", query).casefold().translate(_APOSTROPHES)
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return " ".join(_TOKEN.findall(text))
+
+
+SYNONYMS = _load_synonyms()
+_SYNONYM_PATTERN = re.compile(
+    r"\b(" + "|".join(re.escape(v) for v in sorted(SYNONYMS, key=len, reverse=True)) + r")\b"
+)
+# Words that are correct by definition: brands and both sides of every synonym
+_LEXICON = frozenset(
+    word
+    for phrase in (*KNOWN_BRANDS, *SYNONYMS, *SYNONYMS.values())
+    for word in _fold(phrase).split()
+)
+_LEXICON_BUCKETS = spelling_buckets(_LEXICON)
+
+
+@dataclass(frozen=True, slots=True)
+class CanonicalQuery:
+    """
+    A search query in canonical form.
+
+    text: cleaned and spell-corrected query in the user's word order, what
+          platforms are searched for (synonyms are not applied)
+    key:  its distinct tokens with synonyms mapped, sorted; shared by every
+          spelling/order variant and independent of the suggestion index
+    """
+
+    text: str
+    key: str
+
+
+class _Speller:
+    """Corrects unknown words against the stable lexicon, plus an index's vocabulary if given."""
+
+    def __init__(self, index: SuggestionIndex | None = None):
+        # (known words, fuzzy candidates by first letter and length); an
+        # index brings its own, built with it off the event loop
+        self._sources = [(_LEXICON, _LEXICON_BUCKETS)]
+        if index is not None:
+            self._sources.append((index.vocabulary, index.spelling_buckets))
+
+    def _known(self, word: str) -> bool:
+        return any(word in known for known, _ in self._sources)
+
+    def correct(self, token: str) -> list[str]:
+        """The token itself if known, else a split into two known words or the closest word."""
+        if len(token) < _MIN_CORRECTABLE or not token.isalpha() or self._known(token):
+            return [token]
+
+        # "fitme" -> "fit me": prefer the most even split
+        for i in sorted(range(2, len(token) - 1), key=lambda i: abs(len(token) / 2 - i)):
+            if self._known(token[:i]) and self._known(token[i:]):
+                return [token[:i], token[i:]]
+
+        candidates = [
+            word
+            for _, buckets in self._sources
+            for n in range(len(token) - 2, len(token) + 3)
+            for word in buckets.get((token[0], n), ())
+        ]
+        best = process.extractOne(
+            token, candidates, scorer=fuzz.ratio, score_cutoff=settings.canonical_spelling_cutoff
+        )
+        return [best[0]] if best else [token]
+
+
+# Keys only ever use the stable lexicon, so a query's key survives index rebuilds
+_key_speller = _Speller()
+_speller = _key_speller
+_speller_source: SuggestionIndex | None = None
+
+_stats = {"queries": 0, "rewritten": 0, "corrected": 0, "split": 0, "synonyms": 0, "units": 0}
+
+
+def _unit(match: re.Match) -> str:
+    number, unit = match.group(1), match.group(2)
+    if "." in number:
+        number = number.rstrip("0").rstrip(".")
+    return number + _UNIT_ALIASES.get(unit, unit)
+
+
+def _with_units(text: str) -> str:
+    """Units joined to their numbers, "spf 50" to "spf50"."""
+    return _SPF.sub(r"spf\1", _UNIT.sub(_unit, text))
+
+
+@lru_cache(maxsize=8192)
+def _canonical_key(query: str) -> str:
+    text = _fold(query)
+    if not settings.canonicalize_queries:
+        return text
+
+    with_units = _with_units(text)
+    if with_units != text:
+        _stats["units"] += 1
+
+    words: list[str] = []
+    for token in with_units.split():
+        corrected = _key_speller.correct(token)
+        if corrected != [token]:
+            _stats["split" if len(corrected) > 1 else "corrected"] += 1
+        words += corrected
+
+    # Synonyms after spelling, so "sunscren" -> "sunscreen" and "sun scren" -> "sunscreen"
+    phrased = " ".join(words)
+    mapped = _SYNONYM_PATTERN.sub(lambda m: SYNONYMS[m.group(1)], phrased)
+    if mapped != phrased:
+        _stats["synonyms"] += 1
+    return " ".join(sorted(set(mapped.split())))
+
+
+@lru_cache(maxsize=8192)
+def _search_text(query: str) -> str:
+    text = _fold(query)
+    if not settings.canonicalize_queries:
+        return text
+    words = [word for token in _with_units(text).split() for word in _speller.correct(token)]
+    return " ".join(dict.fromkeys(words))
+
+
+def _sync_speller() -> None:
+    """Pick up a rebuilt suggestion index: its vocabulary may correct search text differently."""
+    global _speller, _speller_source
+    index = suggestion_index.index
+    if index is not _speller_source:
+        # Cheap: the index built its spelling buckets in its own build
+        _speller = _Speller(index)
+        _speller_source = index
+        _search_text.cache_clear()
+
+
+def canonical_key(query: str) -> str:
+    """
+    Cache, coalescing and log key of a search query: Unicode folded, units
+    joined to their numbers ("30 ml" -> "30ml"), words unknown to the brand
+    and synonym lexicon spell-corrected or split, synonyms mapped, repeated
+    words dropped and the rest sorted, so "fit me maybelline" and
+    "maybeline fit me" share one key. It depends only on the query (and the
+    shipped lexicon), never on the suggestion index.
+    """
+    key = _canonical_key(query)
+    _stats["queries"] += 1
+    if key != query.lower().strip():
+        _stats["rewritten"] += 1
+    return key
+
+
+def canonicalize(query: str) -> CanonicalQuery:
+    """
+    The query's key plus the text platforms are searched for: folded, units
+    joined, spelling corrected against the suggestion index as well, in the
+    user's word order and without synonym rewrites.
+    """
+    _sync_speller()
+    return CanonicalQuery(_search_text(query), canonical_key(query))
+
+
+def get_canonical_stats() -> dict:
+    info = _canonical_key.cache_info()
+    return {
+        **_stats,
+        "lexicon": len(_LEXICON),
+        "vocabulary": len(_speller_source.vocabulary) if _speller_source is not None else 0,
+        "memo_hits": info.hits,
+        "memo_misses": info.misses,
+    }
@@ -0,0 +1,255 @@
+import logging
+import re
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, func, select, text
+
+from app.config import get_settings
+from app.models.database import PriceRecord, async_session, engine
+from app.models.schemas import Platform, ProductResult, SearchResponse
+from app.services.canonical import canonicalize
+from app.services.executor import run_cpu
+from app.services.matcher import match_products
+from app.utils.text import normalize_text
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_TOKEN = re.compile(r"\w+")
+
+# Set by init_catalog(): "fts5", "postgres" or None (tier disabled)
+_backend: str | None = None
+_pg_trigram = False
+
+_stats = {"fresh": 0, "stale": 0, "too_old": 0, "too_thin": 0, "miss": 0}
+
+_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE products_fts USING fts5(
+        normalized_name, brand,
+        content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, normalized_name, brand)
+        VALUES (new.id, new.normalized_name, new.brand);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, normalized_name, brand)
+        VALUES ('delete', old.id, old.normalized_name, old.brand);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, normalized_name, brand)
+        VALUES ('delete', old.id, old.normalized_name, old.brand);
+        INSERT INTO products_fts(rowid, normalized_name, brand)
+        VALUES (new.id, new.normalized_name, new.brand);
+    END
+    """,
+]
+
+
+async def init_catalog() -> None:
+    """Create the full-text index over products (after init_db)."""
+    global _backend, _pg_trigram
+    if not settings.catalog_enabled:
+        return
+    try:
+        async with engine.begin() as conn:
+            if engine.dialect.name == "sqlite":
+                exists = await conn.scalar(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+                )
+                if not exists:
+                    await conn.execute(text(_SQLITE_DDL[0]))
+                for ddl in _SQLITE_DDL[1:]:
+                    await conn.execute(text(ddl))
+                if not exists:
+                    # Index products stored before the FTS table existed
+                    await conn.execute(text("INSERT INTO products_fts(products_fts) VALUES ('rebuild')"))
+                _backend = "fts5"
+            elif engine.dialect.name == "postgresql":
+                await conn.execute(
+                    text(
+                        "CREATE INDEX IF NOT EXISTS ix_products_tsv ON products "
+                        "USING gin (to_tsvector('simple', normalized_name))"
+                    )
+                )
+                _backend = "postgres"
+        if _backend == "postgres":
+            _pg_trigram = await _enable_pg_trigram()
+    except Exception as e:
+        _backend = None
+        logger.warning(f"Catalog search disabled, could not build the full-text index: {e}")
+        return
+    logger.info(f"Catalog search enabled ({_backend}{' + pg_trgm' if _pg_trigram else ''})")
+
+
+async def _enable_pg_trigram() -> bool:
+    """Trigram matching needs the pg_trgm extension; skip it if we may not create it."""
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_products_trgm ON products "
+                    "USING gin (normalized_name gin_trgm_ops)"
+                )
+            )
+        return True
+    except Exception as e:
+        logger.info(f"pg_trgm unavailable, catalog uses full-text matching only: {e}")
+        return False
+
+
+async def _find_products(session, query: str, n: int) -> list:
+    """Product rows matching the query, best first."""
+    tokens = _TOKEN.findall(normalize_text(canonicalize(query).text))
+    if not tokens:
+        return []
+
+    if _backend == "fts5":
+        # Every token must match, the last one as a prefix ("foundat" -> "foundation")
+        match = " AND ".join(f'"{t}"' for t in tokens[:-1]) + (" AND " if len(tokens) > 1 else "")
+        match += f'"{tokens[-1]}"*'
+        stmt = text(
+            "SELECT p.id, p.name, p.brand, p.image_url FROM products_fts "
+            "JOIN products p ON p.id = products_fts.rowid "
+            "WHERE products_fts MATCH :match ORDER BY bm25(products_fts) LIMIT :n"
+        )
+        return (await session.execute(stmt, {"match": match, "n": n})).all()
+
+    tsquery = " & ".join(tokens[:-1] + [f"{tokens[-1]}:*"])
+    condition = "to_tsvector('simple', normalized_name) @@ to_tsquery('simple', :tsq)"
+    rank = "ts_rank(to_tsvector('simple', normalized_name), to_tsquery('simple', :tsq))"
+    if _pg_trigram:
+        # Trigram similarity also catches misspellings full-text search misses
+        condition = f"({condition} OR normalized_name % :q)"
+        rank = f"greatest({rank}, similarity(normalized_name, :q))"
+    stmt = text(
+        f"SELECT id, name, brand, image_url FROM products WHERE {condition} "
+        f"ORDER BY {rank} DESC LIMIT :n"
+    )
+    return (await session.execute(stmt, {"tsq": tsquery, "q": " ".join(tokens), "n": n})).all()
+
+
+async def _latest_prices(session, product_ids: list[int]) -> list:
+    """The most recent price record per (product, platform)."""
+    latest = (
+        select(
+            PriceRecord.product_id,
+            PriceRecord.platform,
+            func.max(PriceRecord.scraped_at).label("scraped_at"),
+        )
+        .where(PriceRecord.product_id.in_(product_ids))
+        .group_by(PriceRecord.product_id, PriceRecord.platform)
+        .subquery()
+    )
+    stmt = select(PriceRecord).join(
+        latest,
+        and_(
+            PriceRecord.product_id == latest.c.product_id,
+            PriceRecord.platform == latest.c.platform,
+            PriceRecord.scraped_at == latest.c.scraped_at,
+        ),
+    )
+    return list((await session.execute(stmt)).scalars())
+
+
+def _freshness(age_seconds: float) -> str:
+    """Policy for prices recent enough to serve: answer alone, or answer and refresh."""
+    return "fresh" if age_seconds <= settings.catalog_fresh_seconds else "stale"
+
+
+async def search_catalog(query: str, limit: int) -> SearchResponse | None:
+    """
+    Answer a query from stored products and their latest prices.
+
+    Prices older than catalog_max_age_seconds are left out. Returns None
+    when the catalog can't stand in for a live search: nothing matches, or
+    too few platforms have recent enough prices. A stale answer, or one
+    missing a platform, is returned marked stale; the caller refreshes it
+    in the background.
+    """
+    if _backend is None:
+        return None
+    start_time = time.time()
+
+    try:
+        async with async_session() as session:
+            products = await _find_products(session, query, settings.catalog_candidates)
+            if not products:
+                _stats["miss"] += 1
+                return None
+            records = await _latest_prices(session, [p.id for p in products])
+    except Exception as e:
+        logger.warning(f"Catalog search failed for '{query}': {e}")
+        return None
+
+    by_product: dict[int, list[PriceRecord]] = {}
+    for record in records:
+        by_product.setdefault(record.product_id, []).append(record)
+
+    # Per platform, keep the best-ranked products, like an adapter's page.
+    # Listings last seen too long ago (e.g. discontinued) are skipped, so
+    # they neither show up nor age the whole answer.
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.catalog_max_age_seconds)
+    all_results: dict[str, list[ProductResult]] = {}
+    oldest: datetime | None = None
+    skipped_old = False
+    for product in products:
+        for record in by_product.get(product.id, []):
+            if record.scraped_at < cutoff:
+                skipped_old = True
+                continue
+            platform_results = all_results.setdefault(record.platform, [])
+            if len(platform_results) >= limit:
+                continue
+            platform_results.append(
+                ProductResult(
+                    name=product.name,
+                    brand=product.brand.title(),
+                    price=record.price,
+                    mrp=record.mrp or record.price,
+                    discount_percent=record.discount_percent or 0,
+                    image_url=product.image_url or "",
+                    product_url=record.product_url or "",
+                    platform=Platform(record.platform),
+                    in_stock=record.in_stock,
+                )
+            )
+            if oldest is None or record.scraped_at < oldest:
+                oldest = record.scraped_at
+
+    if len(all_results) < settings.catalog_min_platforms or oldest is None:
+        _stats["too_old" if skipped_old else "too_thin"] += 1
+        return None
+
+    age = (datetime.utcnow() - oldest).total_seconds()
+    freshness = _freshness(age)
+    if freshness == "fresh" and len(all_results) < len(Platform):
+        # Served, but refreshed so the missing platforms get filled in
+        freshness = "stale"
+    _stats[freshness] += 1
+
+    matched = await run_cpu(match_products, all_results)
+    return SearchResponse(
+        query=query,
+        results=matched,
+        total_results=len(matched),
+        platforms_searched=list(all_results),
+        source="catalog",
+        stale=freshness == "stale",
+        cache_age_seconds=int(age),
+        search_time_ms=int((time.time() - start_time) * 1000),
+    )
+
+
+def get_catalog_stats() -> dict:
+    return {"backend": _backend, "trigram": _pg_trigram, **_stats}
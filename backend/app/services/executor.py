@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import multiprocessing
+import statistics
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+def _timed(fn: Callable[..., T], submitted_at: float, args: tuple) -> tuple[T, float]:
+    """Run fn in the worker and report how long it waited to start."""
+    # Wall clock, so the wait is comparable across processes
+    waited = time.time() - submitted_at
+    return fn(*args), waited
+
+
+class CPUExecutor:
+    """
+    Run CPU-bound work (HTML parsing, matching) off the event loop.
+
+    A thread pool suits work that releases the GIL (lxml, rapidfuzz, NumPy);
+    a process pool isolates pure-Python parsing. At most workers + queue_size
+    jobs are admitted; further callers wait for a slot, which pushes back on
+    the request path instead of growing an unbounded backlog.
+    """
+
+    def __init__(self, kind: str, workers: int, queue_size: int) -> None:
+        self.kind = kind
+        self.workers = workers
+        self._slots = asyncio.Semaphore(workers + queue_size)
+        self._capacity = workers + queue_size
+        self._pool: Executor | None = None
+        self._waits: deque[float] = deque(maxlen=1000)
+        self._admitted = 0
+        self._completed = 0
+
+    def start(self) -> None:
+        if self._pool is not None:
+            return
+        if self.kind == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cpu")
+        logger.info(f"CPU executor started: {self.workers} {self.kind} workers")
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(*args) in the pool. fn and args must be picklable for processes."""
+        self.start()
+        loop = asyncio.get_running_loop()
+        submitted_at = time.time()
+        await self._slots.acquire()
+        self._admitted += 1
+        try:
+            future = self._pool.submit(_timed, fn, submitted_at, args)
+        except BaseException:
+            self._release()
+            raise
+        # The slot is freed when the job ends, not when the caller stops
+        # waiting: a cancelled caller's job keeps running in the pool (a
+        # job still queued is cancelled with it)
+        future.add_done_callback(lambda _: self._release_threadsafe(loop))
+        result, waited = await asyncio.wrap_future(future)
+        self._completed += 1
+        self._waits.append(waited)
+        return result
+
+    def _release(self) -> None:
+        self._admitted -= 1
+        self._slots.release()
+
+    def _release_threadsafe(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Done callbacks run in the worker (or cancelling) thread
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            pass  # loop already closed at shutdown
+
+    def shutdown(self) -> None:
+        """Stop the pool. Called from the app lifespan."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "capacity": self._capacity,
+            "in_flight": self._admitted,
+            "completed": self._completed,
+            "queue_wait_ms": {
+                "p50": round(statistics.median(waits) * 1000, 2) if waits else 0,
+                "p95": round(waits[int(len(waits) * 0.95)] * 1000, 2) if waits else 0,
+                "max": round(waits[-1] * 1000, 2) if waits else 0,
+            },
+        }
+
+
+cpu_executor = CPUExecutor(
+    settings.cpu_executor, settings.cpu_workers, settings.cpu_queue_size
+)
+
+
+async def run_cpu(fn: Callable[..., T], *args: Any) -> T:
+    """Run a CPU-bound function on the shared executor."""
+    return await cpu_executor.run(fn, *args)
@@ -0,0 +1,69 @@
+import logging
+from collections import deque
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class LatencyTracker:
+    """
+    Rolling window of call latencies per platform.
+
+    Until a platform has latency_min_samples samples, every estimate falls
+    back to the fixed request_timeout and hedging stays off.
+    """
+
+    def __init__(self, window: int, min_samples: int) -> None:
+        self.min_samples = min_samples
+        self._window = window
+        self._samples: dict[str, deque[float]] = {}
+        self._hedges: dict[str, int] = {}
+
+    def record(self, platform: str, seconds: float) -> None:
+        self._samples.setdefault(platform, deque(maxlen=self._window)).append(seconds)
+
+    def record_hedge(self, platform: str) -> None:
+        self._hedges[platform] = self._hedges.get(platform, 0) + 1
+
+    def percentile(self, platform: str, q: float) -> float | None:
+        """The q-th percentile (0-100) in seconds, or None without enough samples."""
+        samples = self._samples.get(platform)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(int(len(ordered) * q / 100), len(ordered) - 1)]
+
+    def deadline(self, platform: str) -> float:
+        """How long to wait for a platform: a multiple of its p99, within bounds."""
+        p99 = self.percentile(platform, 99)
+        if p99 is None:
+            return settings.request_timeout
+        return min(
+            max(p99 * settings.adaptive_timeout_multiplier, settings.adaptive_timeout_min),
+            settings.request_timeout,
+        )
+
+    def hedge_after(self, platform: str) -> float | None:
+        """When to send a hedged duplicate request (the p95), or None."""
+        if not settings.hedge_requests:
+            return None
+        return self.percentile(platform, 95)
+
+    def stats(self) -> dict:
+        stats = {}
+        for platform in self._samples:
+            p50, p95, p99 = (self.percentile(platform, q) for q in (50, 95, 99))
+            stats[platform] = {
+                "samples": len(self._samples[platform]),
+                "p50_ms": round(p50 * 1000) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000) if p95 is not None else None,
+                "p99_ms": round(p99 * 1000) if p99 is not None else None,
+                "deadline_ms": round(self.deadline(platform) * 1000),
+                "hedged": self._hedges.get(platform, 0),
+            }
+        return stats
+
+
+latency = LatencyTracker(settings.latency_window, settings.latency_min_samples)
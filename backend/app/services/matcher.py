@@ -1,21 +1,32 @@
 import logging
-from rapidfuzz import fuzz
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from scipy.optimize import linear_sum_assignment
+
+from app.config import get_settings
 from app.models.schemas import ProductResult, MatchedProduct
-from app.utils.text import normalize_text, extract_brand, extract_size
+from app.utils.features import text_features
+from app.utils.text import normalize_text
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 MATCH_THRESHOLD = 60  # minimum similarity score to consider a match
 
 
 def match_products(
     all_results: dict[str, list[ProductResult]],
+    mode: str | None = None,
 ) -> list[MatchedProduct]:
     """
     Group products across platforms that refer to the same item.
 
     Args:
         all_results: dict mapping platform name -> list of ProductResult
+        mode: "greedy" (first-fit around each anchor) or "optimal"
+            (assignment-based, at most one listing per platform per group).
+            Defaults to settings.matcher_mode.
 
     Returns:
         List of MatchedProduct with prices from multiple platforms.
@@ -28,36 +39,12 @@ def match_products(
     if not flat:
         return []
 
-    # Build groups using greedy matching
-    used: set[int] = set()
-    groups: list[list[ProductResult]] = []
-
-    for i, product_a in enumerate(flat):
-        if i in used:
-            continue
-
-        group = [product_a]
-        used.add(i)
-
-        for j, product_b in enumerate(flat):
-            if j in used:
-                continue
-            # Don't match products from the same platform
-            if product_a.platform == product_b.platform:
-                continue
-
-            score = _similarity_score(product_a, product_b)
-            if score >= MATCH_THRESHOLD:
-                group.append(product_b)
-                used.add(j)
-
-        groups.append(group)
-
-    # Also add unmatched products as single-platform entries
-    for i, product in enumerate(flat):
-        if i not in used:
-            groups.append([product])
-            used.add(i)
+    scores = _score_matrix(flat)
+    if (mode or settings.matcher_mode) == "optimal":
+        index_groups = _optimal_groups(flat, scores)
+    else:
+        index_groups = _greedy_groups(flat, scores)
+    groups = [[flat[i] for i in group] for group in index_groups]
 
     # Convert groups to MatchedProduct objects
     matched: list[MatchedProduct] = []
@@ -71,37 +58,110 @@ def match_products(
     return matched
 
 
-def _similarity_score(a: ProductResult, b: ProductResult) -> float:
-    """Compute a combined similarity score between two products (0-100)."""
-    name_a = normalize_text(a.name)
-    name_b = normalize_text(b.name)
+def _greedy_groups(flat: list[ProductResult], scores: np.ndarray) -> list[list[int]]:
+    """Assign each unused product, in order, to the first anchor it matches."""
+    platforms = np.array([p.platform.value for p in flat])
+    used = np.zeros(len(flat), dtype=bool)
+    groups: list[list[int]] = []
+
+    for i in range(len(flat)):
+        if used[i]:
+            continue
+        used[i] = True
+
+        # Don't match products from the same platform as the anchor
+        candidates = np.flatnonzero(
+            ~used & (platforms != platforms[i]) & (scores[i] >= MATCH_THRESHOLD)
+        )
+        used[candidates] = True
+        groups.append([i, *candidates.tolist()])
+
+    return groups
+
+
+def _optimal_groups(flat: list[ProductResult], scores: np.ndarray) -> list[list[int]]:
+    """
+    Build groups with at most one listing per platform.
+
+    Platforms are merged one at a time (largest first): each step solves an
+    assignment problem between the groups built so far and the next
+    platform's products, weighting a pair by the group's average score
+    against the product. Pairs below MATCH_THRESHOLD are not allowed, and
+    unassigned products start new groups. Each step is O(n^3) on at most
+    a few hundred products.
+    """
+    by_platform: dict[str, list[int]] = {}
+    for i, product in enumerate(flat):
+        by_platform.setdefault(product.platform.value, []).append(i)
+    order = sorted(by_platform, key=lambda p: (-len(by_platform[p]), p))
+
+    groups: list[list[int]] = [[i] for i in by_platform[order[0]]]
+    for platform in order[1:]:
+        members = by_platform[platform]
+        weights = np.array([scores[group][:, members].mean(axis=0) for group in groups])
+        weights[weights < MATCH_THRESHOLD] = 0
+
+        rows, cols = linear_sum_assignment(weights, maximize=True)
+        assigned: set[int] = set()
+        for r, c in zip(rows, cols):
+            if weights[r, c] > 0:
+                groups[r].append(members[c])
+                assigned.add(c)
+        groups.extend([m] for c, m in enumerate(members) if c not in assigned)
+
+    # Keep the earliest-listed product first so it stays the canonical one
+    for group in groups:
+        group.sort()
+    groups.sort(key=lambda g: g[0])
+    return groups
+
+
+def _codes(values: list[str]) -> np.ndarray:
+    """Map strings to integer ids so equality can be compared as arrays; '' -> -1."""
+    ids: dict[str, int] = {}
+    return np.array([ids.setdefault(v, len(ids)) if v else -1 for v in values])
+
+
+def _score_matrix(flat: list[ProductResult]) -> np.ndarray:
+    """
+    Pairwise similarity scores (0-100) for every pair of products.
+
+    Text features are computed once per product, name similarity for all
+    pairs in one rapidfuzz call, and the brand/size/price adjustments as
+    array masks.
+    """
+    features = [text_features(p.name) for p in flat]
 
     # Fuzzy name similarity (token_sort handles word reordering)
-    name_score = fuzz.token_sort_ratio(name_a, name_b)
+    names = [f.normalized for f in features]
+    scores = process.cdist(
+        names,
+        names,
+        scorer=fuzz.token_sort_ratio,
+        dtype=np.float64,
+        workers=settings.matcher_workers,
+    )
 
     # Brand match bonus
-    brand_a = normalize_text(a.brand) if a.brand else extract_brand(a.name).lower()
-    brand_b = normalize_text(b.brand) if b.brand else extract_brand(b.name).lower()
-    brand_bonus = 15 if brand_a and brand_b and brand_a == brand_b else 0
+    brands = _codes(
+        [normalize_text(p.brand) if p.brand else f.brand.lower() for p, f in zip(flat, features)]
+    )
+    scores += np.where((brands[:, None] == brands[None, :]) & (brands[:, None] >= 0), 15, 0)
 
-    # Size match bonus / penalty
-    size_a = extract_size(a.name)
-    size_b = extract_size(b.name)
-    size_mod = 0
-    if size_a and size_b:
-        size_mod = 10 if size_a == size_b else -20  # penalize size mismatch
+    # Size match bonus / penalty (only when both sizes are known)
+    sizes = _codes([f.size for f in features])
+    both_sized = (sizes[:, None] >= 0) & (sizes[None, :] >= 0)
+    scores += np.where(both_sized, np.where(sizes[:, None] == sizes[None, :], 10, -20), 0)
 
     # Price proximity bonus (products at wildly different prices are likely different)
-    price_mod = 0
-    if a.price > 0 and b.price > 0:
-        ratio = min(a.price, b.price) / max(a.price, b.price)
-        if ratio > 0.7:
-            price_mod = 5
-        elif ratio < 0.3:
-            price_mod = -15
-
-    total = name_score + brand_bonus + size_mod + price_mod
-    return min(max(total, 0), 100)
+    prices = np.array([p.price for p in flat], dtype=np.float64)
+    both_priced = (prices[:, None] > 0) & (prices[None, :] > 0)
+    low = np.minimum.outer(prices, prices)
+    high = np.maximum.outer(prices, prices)
+    ratio = np.divide(low, high, out=np.zeros_like(low), where=both_priced)
+    scores += np.where(both_priced & (ratio > 0.7), 5, np.where(both_priced & (ratio < 0.3), -15, 0))
+
+    return np.clip(scores, 0, 100)
 
 
 def _build_matched_product(group: list[ProductResult]) -> MatchedProduct:
@@ -0,0 +1,84 @@
+import time
+from collections import OrderedDict
+
+from app.utils.text import normalize_text
+
+
+class PrefixCache:
+    """
+    Suggestion cache that answers a query from the nearest cached prefix.
+
+    Each entry keeps the full candidate pool gathered for a normalized
+    query, not just the page that was served. A longer query ("mayb") is
+    answered by filtering the pool of its longest cached prefix ("may")
+    when at least a page of candidates survives; the sources are truncated
+    top-K lists, so fewer survivors say nothing about what is missing and
+    the caller goes back to the sources. Empty pools are cached under a
+    shorter TTL and answer every extension of their prefix with nothing.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, negative_ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # key -> (expires_at, [(display, normalized), ...]), in LRU order
+        self._entries: OrderedDict[str, tuple[float, list[tuple[str, str]]]] = OrderedDict()
+        self._hits = 0
+        self._prefix_hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+
+    def _live(self, key: str) -> list[tuple[str, str]] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, items = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return items
+
+    def find(self, query: str, limit: int) -> list[str] | None:
+        """Suggestions for a normalized query, or None if the sources must be asked."""
+        for end in range(len(query), 0, -1):
+            items = self._live(query[:end])
+            if items is None:
+                continue
+            if not items:
+                self._negative_hits += 1
+                return []
+            if end == len(query):
+                self._hits += 1
+                return [display for display, _ in items]
+            # Only the nearest cached prefix is consulted: it is the most specific
+            refined = [display for display, norm in items if query in norm]
+            if len(refined) >= limit:
+                self._prefix_hits += 1
+                return refined
+            break
+        self._misses += 1
+        return None
+
+    def set(self, query: str, suggestions: list[str]) -> None:
+        ttl = self.ttl if suggestions else self.negative_ttl
+        items = [(s, normalize_text(s)) for s in suggestions]
+        self._entries[query] = (time.monotonic() + ttl, items)
+        self._entries.move_to_end(query)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._prefix_hits + self._negative_hits + self._misses
+        served = lookups - self._misses
+        return {
+            "entries": len(self._entries),
+            "hits": self._hits,
+            "prefix_hits": self._prefix_hits,
+            "negative_hits": self._negative_hits,
+            "misses": self._misses,
+            "hit_rate": round(served / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,213 @@
+import asyncio
+import heapq
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.config import get_settings
+from app.models.database import SearchLog, async_session
+from app.services import cache
+from app.services.canonical import canonical_key
+from app.services.search import prewarm_search
+from app.services.suggestions import POPULAR_TERMS, TRENDING
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Longest the scheduler sleeps before re-checking its queue
+_MAX_IDLE_SECONDS = 60.0
+
+
+async def _top_logged_queries(limit: int) -> list[tuple[str, int]]:
+    """Most frequent recent searches that found something (by canonical form), with counts."""
+    since = datetime.utcnow() - timedelta(days=settings.prewarm_log_days)
+    # Rows logged before canonicalization only have the raw query
+    canonical = func.coalesce(SearchLog.canonical_query, func.lower(SearchLog.query))
+    stmt = (
+        select(func.min(SearchLog.query), func.count(SearchLog.id).label("cnt"))
+        .where(SearchLog.timestamp >= since)
+        .where(SearchLog.results_count > 0)
+        .group_by(canonical)
+        .order_by(func.count(SearchLog.id).desc())
+        .limit(limit)
+    )
+    try:
+        async with async_session() as session:
+            return [(row[0], row[1]) for row in await session.execute(stmt)]
+    except Exception as e:
+        logger.warning(f"Prewarm: could not read search logs - {e}")
+        return []
+
+
+async def ranked_queries() -> list[tuple[str, int]]:
+    """
+    The head of the query distribution as (query, traffic), busiest first:
+    curated trending and popular terms plus the most searched logged queries,
+    deduplicated by canonical form. Curated terms win ties in their listed order.
+    """
+    logged = await _top_logged_queries(settings.prewarm_max_queries)
+    traffic: dict[str, int] = {}
+    for query, count in logged:
+        key = canonical_key(query)
+        traffic[key] = traffic.get(key, 0) + count
+
+    candidates: dict[str, tuple[str, int, int]] = {}
+    for order, term in enumerate([*TRENDING, *POPULAR_TERMS, *(q for q, _ in logged)]):
+        term = term.strip()
+        if len(term) < 2:
+            continue
+        key = canonical_key(term)
+        if key not in candidates:
+            candidates[key] = (term, traffic.get(key, 0), order)
+    ranked = sorted(candidates.values(), key=lambda c: (-c[1], c[2]))
+    return [(term, traffic) for term, traffic, _ in ranked[: settings.prewarm_max_queries]]
+
+
+class PrewarmScheduler:
+    """
+    Keep the busiest queries' cached responses fresh so users never wait on them.
+
+    Queries sit in a heap keyed by when they are next due: a little before
+    their cached response turns stale, less a random jitter so refreshes
+    made together drift apart. Whatever is due is dispatched busiest first.
+    Each platform has its own budget of concurrent prewarm calls, so
+    warming never takes more than its share of a platform's throttle.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, str]] = []  # (due, cache key)
+        self._queries: dict[str, tuple[str, int]] = {}  # cache key -> (query, traffic)
+        self._running: set[str] = set()
+        self._platform_slots: dict[str, asyncio.Semaphore] = {}
+        self._dispatch: asyncio.Semaphore | None = None
+        self._task: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._reload_at = 0.0
+        self._stats = {"refreshed": 0, "skipped_fresh": 0, "partial": 0, "failed": 0}
+
+    def start(self) -> None:
+        if not settings.prewarm_enabled:
+            return
+        if self._task is None or self._task.done():
+            budgets = settings.prewarm_platform_concurrency
+            self._platform_slots = {}
+            self._dispatch = asyncio.Semaphore(max(budgets.values(), default=1))
+            self._task = asyncio.create_task(self._run(), name="prewarm-scheduler")
+
+    @asynccontextmanager
+    async def _platform_slot(self, platform: str):
+        slot = self._platform_slots.get(platform)
+        if slot is None:
+            slot = asyncio.Semaphore(settings.prewarm_platform_concurrency.get(platform, 1))
+            self._platform_slots[platform] = slot
+        async with slot:
+            yield
+
+    def _jitter(self) -> float:
+        return random.uniform(0, settings.prewarm_jitter_seconds)
+
+    def _due_after_refresh(self, age: float) -> float:
+        """When a response that is `age` seconds old should be refreshed next."""
+        lead = settings.prewarm_lead_seconds + self._jitter()
+        return time.time() + max(settings.cache_soft_ttl_seconds - lead - age, 0.0)
+
+    async def _reload(self) -> None:
+        """Re-rank the query list; new queries are due right away (jittered)."""
+        ranked = await ranked_queries()
+        previous = self._queries
+        self._queries = {cache.make_key(query): (query, traffic) for query, traffic in ranked}
+        now = time.time()
+        for key in self._queries.keys() - previous.keys():
+            heapq.heappush(self._heap, (now + self._jitter(), key))
+        # Entries for dropped queries stay in the heap and are skipped when popped
+        self._reload_at = now + settings.prewarm_reload_seconds
+        logger.info(f"Prewarm: tracking {len(self._queries)} queries")
+
+    async def _refresh(self, key: str, query: str) -> None:
+        limit = settings.prewarm_limit
+        due = time.time() + settings.prewarm_retry_seconds + self._jitter()
+        fresh_for = settings.cache_soft_ttl_seconds - settings.prewarm_lead_seconds
+        try:
+            # A user search may have refreshed it since it was scheduled
+            age = await cache.get_cached_age(query, limit)
+            if age is not None and age < fresh_for:
+                self._stats["skipped_fresh"] += 1
+                due = self._due_after_refresh(age)
+                return
+            response = await prewarm_search(query, limit, self._platform_slot)
+            if response.platforms_failed or response.platforms_pending or not response.results:
+                # Not cached (or nothing to cache); try again sooner
+                self._stats["partial"] += 1
+                return
+            self._stats["refreshed"] += 1
+            due = self._due_after_refresh(0)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._stats["failed"] += 1
+            logger.warning(f"Prewarm failed for '{query}': {e}")
+        finally:
+            self._running.discard(key)
+            if key in self._queries:
+                heapq.heappush(self._heap, (due, key))
+            self._dispatch.release()
+
+    async def _run(self) -> None:
+        await asyncio.sleep(settings.prewarm_start_delay_seconds)
+        while True:
+            try:
+                if time.time() >= self._reload_at:
+                    await self._reload()
+
+                now = time.time()
+                due: list[str] = []
+                while self._heap and self._heap[0][0] <= now:
+                    _, key = heapq.heappop(self._heap)
+                    if key in self._queries and key not in self._running:
+                        due.append(key)
+                # Busiest first among everything that is due
+                due.sort(key=lambda k: -self._queries[k][1])
+                for key in due:
+                    await self._dispatch.acquire()
+                    self._running.add(key)
+                    task = asyncio.create_task(self._refresh(key, self._queries[key][0]))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Prewarm scheduler error: {e}")
+
+            next_due = self._heap[0][0] if self._heap else float("inf")
+            wake = min(next_due, self._reload_at) - time.time()
+            await asyncio.sleep(min(max(wake, 0.1), _MAX_IDLE_SECONDS))
+
+    async def close(self) -> None:
+        """Stop scheduling and cancel refreshes in progress. Called from the app lifespan."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        next_due = min((due for due, key in self._heap if key in self._queries), default=None)
+        return {
+            "enabled": settings.prewarm_enabled,
+            "queries": len(self._queries),
+            "running": len(self._running),
+            "next_due_in": round(next_due - time.time(), 1) if next_due is not None else None,
+            **self._stats,
+        }
+
+
+prewarmer = PrewarmScheduler()
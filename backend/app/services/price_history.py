@@ -0,0 +1,111 @@
+import logging
+from datetime import datetime
+
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.config import get_settings
+from app.models.database import PriceRecord, Product, async_session, engine
+from app.models.schemas import ProductResult
+from app.services.batch_writer import BatchWriter
+from app.utils.features import text_features
+from app.utils.text import normalize_text
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Canonical products are looked up this many keys per query
+_LOOKUP_CHUNK = 300
+
+# (normalized_name, brand, size)
+ProductKey = tuple[str, str, str]
+
+
+def product_key(result: ProductResult) -> ProductKey:
+    """The canonical identity of a listing: normalized name, brand and size."""
+    features = text_features(result.name)
+    brand = normalize_text(result.brand) if result.brand else features.brand.lower()
+    return features.normalized[:500], brand[:200], features.size
+
+
+def _insert_ignoring_duplicates(table):
+    """INSERT that skips rows violating a unique constraint (SQLite or PostgreSQL)."""
+    dialect = postgresql if engine.dialect.name == "postgresql" else sqlite
+    return dialect.insert(table).on_conflict_do_nothing()
+
+
+async def _write_price_batches(batches: list[tuple[datetime, list[ProductResult]]]) -> None:
+    """
+    Persist scraped listings: upsert their canonical products in bulk, read
+    back the ids in a few keyed selects and append every price in one insert.
+    """
+    products: dict[ProductKey, dict] = {}
+    prices: list[tuple[ProductKey, datetime, ProductResult]] = []
+    for scraped_at, results in batches:
+        for r in results:
+            if r.price <= 0:
+                continue
+            key = product_key(r)
+            if not key[0]:
+                continue
+            products.setdefault(
+                key,
+                {
+                    "name": r.name[:500],
+                    "normalized_name": key[0],
+                    "brand": key[1],
+                    "size": key[2],
+                    "image_url": r.image_url,
+                    "created_at": scraped_at,
+                },
+            )
+            prices.append((key, scraped_at, r))
+    if not prices:
+        return
+
+    async with async_session() as session:
+        await session.execute(_insert_ignoring_duplicates(Product), list(products.values()))
+
+        keys = list(products)
+        ids: dict[ProductKey, int] = {}
+        columns = tuple_(Product.normalized_name, Product.brand, Product.size)
+        for i in range(0, len(keys), _LOOKUP_CHUNK):
+            stmt = select(Product.id, Product.normalized_name, Product.brand, Product.size).where(
+                columns.in_(keys[i : i + _LOOKUP_CHUNK])
+            )
+            for row in await session.execute(stmt):
+                ids[(row.normalized_name, row.brand, row.size)] = row.id
+
+        await session.execute(
+            insert(PriceRecord),
+            [
+                {
+                    "product_id": ids[key],
+                    "platform": r.platform.value,
+                    "price": r.price,
+                    "mrp": r.mrp,
+                    "discount_percent": r.discount_percent,
+                    "product_url": r.product_url,
+                    "in_stock": r.in_stock,
+                    "scraped_at": scraped_at,
+                }
+                for key, scraped_at, r in prices
+                if key in ids
+            ],
+        )
+        await session.commit()
+
+
+price_writer: BatchWriter[tuple[datetime, list[ProductResult]]] = BatchWriter(
+    "price_history",
+    _write_price_batches,
+    max_batch=settings.history_batch_size,
+    flush_interval=settings.history_flush_seconds,
+    max_queue=settings.history_queue_size,
+)
+
+
+def record_prices(results: list[ProductResult]) -> None:
+    """Queue one platform's freshly scraped results for persistence."""
+    if settings.persist_prices and results:
+        price_writer.submit((datetime.utcnow(), list(results)))
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Hashable
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class BackgroundRefresher:
+    """
+    Run cache refreshes off the request path.
+
+    A key is refreshed at most once at a time, and at most `concurrency`
+    refreshes run together; extra ones wait their turn.
+    """
+
+    def __init__(self, concurrency: int) -> None:
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._pending: set[Hashable] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._stats = {"scheduled": 0, "deduplicated": 0, "failed": 0}
+
+    def schedule(self, key: Hashable, fn: Callable[[], Awaitable]) -> bool:
+        """Start a refresh for key unless one is already pending."""
+        if key in self._pending:
+            self._stats["deduplicated"] += 1
+            return False
+        self._pending.add(key)
+        self._stats["scheduled"] += 1
+        task = asyncio.create_task(self._run(key, fn))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _run(self, key: Hashable, fn: Callable[[], Awaitable]) -> None:
+        try:
+            async with self._semaphore:
+                await fn()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._stats["failed"] += 1
+            logger.warning(f"Background refresh failed for {key}: {e}")
+        finally:
+            self._pending.discard(key)
+
+    async def close(self) -> None:
+        """Cancel outstanding refreshes. Called from the app lifespan."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {"pending": len(self._pending), **self._stats}
+
+
+refresher = BackgroundRefresher(settings.cache_refresh_concurrency)
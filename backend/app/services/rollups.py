@@ -0,0 +1,248 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.config import get_settings
+from app.models.database import (
+    PriceRecord, PriceRollup, Product, RollupState, async_session, engine,
+)
+from app.models.schemas import PriceBucket, PriceHistory
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PERIODS = ("day", "week")
+_WATERMARK = "price_rollups"
+
+
+def bucket_start(ts: datetime, period: str) -> datetime:
+    """Start of the day (or Monday-based week) containing ts."""
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day - timedelta(days=day.weekday()) if period == "week" else day
+
+
+def _upsert_rollups():
+    """Insert buckets, merging into existing ones (min/max/sum/samples)."""
+    if engine.dialect.name == "postgresql":
+        stmt = postgresql.insert(PriceRollup)
+        lower, upper = func.least, func.greatest
+    else:
+        stmt = sqlite.insert(PriceRollup)
+        lower, upper = func.min, func.max  # scalar min()/max() with two arguments
+    table, new = PriceRollup.__table__.c, stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=["product_id", "platform", "period", "bucket_start"],
+        set_={
+            "min_price": lower(table.min_price, new.min_price),
+            "max_price": upper(table.max_price, new.max_price),
+            "sum_price": table.sum_price + new.sum_price,
+            "samples": table.samples + new.samples,
+        },
+    )
+
+
+async def _ensure_watermark() -> None:
+    """Create the watermark row if missing (racing workers insert it once)."""
+    dialect = postgresql if engine.dialect.name == "postgresql" else sqlite
+    async with async_session() as session:
+        await session.execute(
+            dialect.insert(RollupState)
+            .values(name=_WATERMARK, last_record_id=0, updated_at=datetime.utcnow())
+            .on_conflict_do_nothing()
+        )
+        await session.commit()
+
+
+async def _max_record_id() -> int:
+    async with async_session() as session:
+        return await session.scalar(select(func.max(PriceRecord.id))) or 0
+
+
+async def compact_once(upper_id: int) -> int:
+    """
+    Fold one chunk of price records with ids up to upper_id into the
+    rollups; returns rows folded.
+
+    Every worker runs a compactor. Writing the watermark row first locks it
+    until commit (a row lock on PostgreSQL, the database write lock on
+    SQLite), so workers fold in turn and each one reads the watermark its
+    predecessor left.
+    """
+    async with async_session() as session:
+        await session.execute(
+            update(RollupState)
+            .where(RollupState.name == _WATERMARK)
+            .values(updated_at=datetime.utcnow())
+        )
+        state = await session.get(RollupState, _WATERMARK)
+
+        records = (
+            await session.execute(
+                select(
+                    PriceRecord.id,
+                    PriceRecord.product_id,
+                    PriceRecord.platform,
+                    PriceRecord.price,
+                    PriceRecord.scraped_at,
+                )
+                .where(PriceRecord.id > state.last_record_id)
+                .where(PriceRecord.id <= upper_id)
+                .order_by(PriceRecord.id)
+                .limit(settings.rollup_chunk_size)
+            )
+        ).all()
+        if not records:
+            await session.commit()
+            return 0
+
+        buckets: dict[tuple, dict] = {}
+        for r in records:
+            for period in PERIODS:
+                key = (r.product_id, r.platform, period, bucket_start(r.scraped_at, period))
+                b = buckets.get(key)
+                if b is None:
+                    buckets[key] = {
+                        "product_id": r.product_id,
+                        "platform": r.platform,
+                        "period": period,
+                        "bucket_start": key[3],
+                        "min_price": r.price,
+                        "max_price": r.price,
+                        "sum_price": r.price,
+                        "samples": 1,
+                    }
+                else:
+                    b["min_price"] = min(b["min_price"], r.price)
+                    b["max_price"] = max(b["max_price"], r.price)
+                    b["sum_price"] += r.price
+                    b["samples"] += 1
+
+        await session.execute(_upsert_rollups(), list(buckets.values()))
+        # Watermark moves in the same transaction, so a chunk is folded exactly once
+        state.last_record_id = records[-1].id
+        state.updated_at = datetime.utcnow()
+        await session.commit()
+        return len(records)
+
+
+async def apply_retention() -> int:
+    """
+    Drop raw price records past the retention window that are already rolled
+    up, keeping the newest record per product and platform (the catalog's
+    latest known price).
+    """
+    cutoff = datetime.utcnow() - timedelta(days=settings.raw_price_retention_days)
+    async with async_session() as session:
+        state = await session.get(RollupState, _WATERMARK)
+        if state is None:
+            return 0
+        newest = (
+            select(func.max(PriceRecord.id))
+            .group_by(PriceRecord.product_id, PriceRecord.platform)
+            .scalar_subquery()
+        )
+        result = await session.execute(
+            delete(PriceRecord)
+            .where(PriceRecord.id <= state.last_record_id)
+            .where(PriceRecord.scraped_at < cutoff)
+            .where(PriceRecord.id.not_in(newest))
+        )
+        await session.commit()
+        return result.rowcount or 0
+
+
+class RollupCompactor:
+    """Periodically folds new price records into rollups and applies retention."""
+
+    def __init__(self) -> None:
+        self._task: asyncio.Task | None = None
+        self._stats = {"runs": 0, "folded": 0, "deleted": 0, "failed": 0}
+        self._last_run: datetime | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop(), name="rollup-compactor")
+
+    async def run(self, settle: float = 0.0) -> None:
+        """
+        Catch up completely, then thin old raw rows.
+
+        Ids are handed out before the inserting transaction commits, so a
+        lower id can become visible after a higher one. Only ids already
+        committed before waiting `settle` seconds are folded: by then the
+        transactions holding lower ones have finished, and the watermark
+        never passes a row that is still to appear.
+        """
+        await _ensure_watermark()
+        upper_id = await _max_record_id()
+        await asyncio.sleep(settle)
+        while folded := await compact_once(upper_id):
+            self._stats["folded"] += folded
+        self._stats["deleted"] += await apply_retention()
+        self._stats["runs"] += 1
+        self._last_run = datetime.utcnow()
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run(settings.rollup_settle_seconds)
+            except Exception as e:
+                self._stats["failed"] += 1
+                logger.warning(f"Price rollup compaction failed: {e}")
+            await asyncio.sleep(settings.rollup_interval_seconds)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {**self._stats, "last_run": self._last_run}
+
+
+rollup_compactor = RollupCompactor()
+
+
+async def get_price_histories(
+    product_ids: list[int], period: str = "day", days: int = 365
+) -> list[PriceHistory]:
+    """Bucketed price history for stored products, read from the rollups only."""
+    since = bucket_start(datetime.utcnow() - timedelta(days=days), period)
+    async with async_session() as session:
+        products = (
+            await session.execute(
+                select(Product.id, Product.name, Product.brand).where(Product.id.in_(product_ids))
+            )
+        ).all()
+        rollups = (
+            await session.execute(
+                select(PriceRollup)
+                .where(PriceRollup.product_id.in_(product_ids))
+                .where(PriceRollup.period == period)
+                .where(PriceRollup.bucket_start >= since)
+                .order_by(PriceRollup.bucket_start)
+            )
+        ).scalars()
+
+        histories = {
+            p.id: PriceHistory(product_id=p.id, name=p.name, brand=p.brand.title(), period=period)
+            for p in products
+        }
+        for r in rollups:
+            histories[r.product_id].platforms.setdefault(r.platform, []).append(
+                PriceBucket(
+                    bucket_start=r.bucket_start,
+                    min_price=r.min_price,
+                    max_price=r.max_price,
+                    avg_price=round(r.sum_price / r.samples, 2),
+                    samples=r.samples,
+                )
+            )
+    return [histories[i] for i in product_ids if i in histories]
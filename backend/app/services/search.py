@@ -1,14 +1,35 @@
 import asyncio
 import logging
 import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager
 
-from app.adapters.base import BaseAdapter
+from pydantic import BaseModel
+
+from app.adapters.base import AdapterBlockedError, BaseAdapter
+from app.adapters.throttle import AdapterThrottledError, request_deadline
 from app.adapters.nykaa import NykaaAdapter
 from app.adapters.amazon import AmazonAdapter
 from app.adapters.tira import TiraAdapter
-from app.models.schemas import SearchResponse, Platform
+from app.models.schemas import (
+    MatchedProduct,
+    MatchUpdate,
+    Platform,
+    PlatformResults,
+    ProductResult,
+    SearchResponse,
+)
+from app.services.executor import run_cpu
+from app.services.latency import latency
 from app.services.matcher import match_products
-from app.services import cache
+from app.services import cache, catalog
+from app.services.breaker import CircuitOpenError, get_breaker
+from app.services.canonical import canonical_key, canonicalize
+from app.services.price_history import record_prices
+from app.services.refresh import refresher
+from app.services.search_log import record_search
+from app.services.singleflight import SingleFlight
+from app.services.suggestion_index import suggestion_index
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -21,68 +42,385 @@ ADAPTERS: list[BaseAdapter] = [
     TiraAdapter(),
 ]
 
+# Context manager entered around one platform's call, given the platform id
+PlatformSlot = Callable[[str], AbstractAsyncContextManager]
+
+# Concurrent identical searches share one fan-out, and concurrent identical
+# platform calls share one outbound request
+_search_flight = SingleFlight("search")
+_adapter_flight = SingleFlight("adapter")
+
+
+def get_adapter(platform: Platform) -> BaseAdapter:
+    """Return the shared adapter instance for a platform."""
+    return next(a for a in ADAPTERS if a.platform == platform)
+
+
+async def start_adapters() -> None:
+    """Open every adapter's connection pool. Called from the app lifespan."""
+    for adapter in ADAPTERS:
+        await adapter.start()
+
+
+async def close_adapters() -> None:
+    """Close every adapter's connection pool. Called from the app lifespan."""
+    for adapter in ADAPTERS:
+        try:
+            await adapter.close()
+        except Exception as e:
+            logger.warning(f"{adapter.platform_name}: error during close - {e}")
+
 
 async def search_products(query: str, limit: int = 10) -> SearchResponse:
     """
     Search for products across all platforms.
 
-    1. Check cache
-    2. Fire parallel requests to all adapters
-    3. Match products across platforms
-    4. Cache and return results
-    """
-    # 1. Check cache
-    cached = cache.get_cached(query)
-    if cached:
-        cached.cached = True
-        return cached
+    Cache entries, coalescing and logs are keyed by the query's canonical
+    form, so spelling, word-order and unit variants share one search.
 
+    1. Check cache (stale entries are served while a refresh runs)
+    2. Check the stored catalog (recent enough prices are served, older
+       ones served while a refresh runs)
+    3. Join an identical search already in flight, or fan out to all
+       adapters (each platform answers from its own cache when fresh,
+       otherwise through a coalesced live call, skipped while its circuit
+       breaker is open)
+    4. Match products across platforms
+    5. Cache and return results
+    """
     start_time = time.time()
+    key = (cache.make_key(query), limit)
+
+    # 1-2. Cache, then catalog; stale answers are served and refreshed in the background
+    stored = await _stored_answer(query, limit, key)
+    if stored:
+        _log_search(query, stored, start_time)
+        return stored
+
+    # 3-5. Join an identical search already in flight, or start one
+    response = await _search_flight.do(key, lambda: _search_uncached(query, limit))
+    if response.query != query:
+        # Joined a search started for a variant of this query
+        response = response.model_copy(update={"query": query})
+    _log_search(query, response, start_time)
+    return response
+
+
+async def _stored_answer(query: str, limit: int, key: tuple) -> SearchResponse | None:
+    """A cached or catalog answer, scheduling a background refresh when it is stale."""
+    stored = await cache.get_cached(query, limit) or await catalog.search_catalog(query, limit)
+    if stored and stored.stale:
+        refresher.schedule(
+            key, lambda: _search_flight.do(key, lambda: _search_uncached(query, limit))
+        )
+    return stored
 
-    # 2. Fire parallel searches
-    platforms_searched: list[str] = []
-    platforms_failed: list[str] = []
-    all_results: dict[str, list] = {}
 
-    async def _search_adapter(adapter: BaseAdapter):
+def _log_search(query: str, response: SearchResponse, start_time: float) -> None:
+    """Queue a search log row (written in the background, in batches)."""
+    record_search(
+        query,
+        canonical_key(query),
+        response.total_results,
+        int((time.time() - start_time) * 1000),
+    )
+
+
+async def _fetch_platform(
+    adapter: BaseAdapter, query: str, limit: int, max_cache_age: float | None = None
+) -> list[ProductResult]:
+    """One platform's results: its own cache first, else a coalesced live call."""
+    platform = adapter.platform.value
+    cached = await cache.get_platform_cached(platform, query, limit, max_cache_age)
+    if cached is not None:
+        logger.debug(f"{adapter.platform_name}: platform cache HIT for '{query}'")
+        return cached
+
+    async def _call() -> list[ProductResult]:
+        # Runs to completion even if every caller gave up, so late results
+        # still land in the cache and the breaker sees the real outcome
+        breaker = get_breaker(platform)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{adapter.platform_name}: circuit open, skipped")
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = latency.deadline(platform)
+        # Requests still queued behind the platform's throttle past this give up
+        request_deadline.set(started + deadline)
+        outcome = "error"
         try:
-            results = await asyncio.wait_for(
-                adapter.search(query, limit=limit),
-                timeout=settings.request_timeout,
-            )
-            all_results[adapter.platform.value] = results
-            platforms_searched.append(adapter.platform.value)
-            logger.info(
-                f"{adapter.platform_name}: found {len(results)} results for '{query}'"
-            )
-        except asyncio.TimeoutError:
-            logger.error(f"{adapter.platform_name}: timed out")
-            platforms_failed.append(adapter.platform.value)
-        except Exception as e:
-            logger.error(f"{adapter.platform_name}: failed - {e}")
-            platforms_failed.append(adapter.platform.value)
+            results = await _hedged_search(adapter, query, limit)
+            if loop.time() - started > deadline:
+                outcome = "timeout"
+            else:
+                outcome = "ok" if results else "empty"
+        except AdapterThrottledError:
+            outcome = "throttled"
+            raise
+        except AdapterBlockedError:
+            outcome = "blocked"
+            raise
+        finally:
+            breaker.record(outcome)
+
+        # An empty list may be a soft failure (bot wall, changed page), so
+        # only non-empty results are worth reusing
+        if results:
+            await cache.set_platform_cached(platform, query, limit, results)
+            suggestion_index.harvest(results)
+            record_prices(results)
+        return results
 
-    # Run all adapters concurrently
-    await asyncio.gather(*[_search_adapter(a) for a in ADAPTERS])
+    flight_key = (platform, cache.make_key(query), limit)
+    return await _adapter_flight.do(flight_key, _call)
 
-    # 3. Match products across platforms
-    matched = match_products(all_results)
+
+async def _hedged_search(adapter: BaseAdapter, query: str, limit: int) -> list[ProductResult]:
+    """
+    Call the adapter; if it runs past the platform's p95, send a duplicate
+    and keep whichever succeeds first.
+    """
+    platform = adapter.platform.value
+    loop = asyncio.get_running_loop()
+
+    async def _timed_search() -> list[ProductResult]:
+        started = loop.time()
+        results = await adapter.search(query, limit=limit)
+        latency.record(platform, loop.time() - started)
+        return results
+
+    calls = {asyncio.create_task(_timed_search())}
+    hedge_after = latency.hedge_after(platform)
+    try:
+        if hedge_after is not None:
+            done, _ = await asyncio.wait(calls, timeout=hedge_after)
+            if not done:
+                logger.info(f"{adapter.platform_name}: slower than p95, hedging")
+                latency.record_hedge(platform)
+                calls.add(asyncio.create_task(_timed_search()))
+
+        error: Exception | None = None
+        while calls:
+            done, calls = await asyncio.wait(calls, return_when=asyncio.FIRST_COMPLETED)
+            for call in done:
+                if call.exception() is None:
+                    return call.result()
+                error = call.exception()
+        raise error
+    finally:
+        for call in calls:
+            call.cancel()
+
+
+async def _search_platform(
+    adapter: BaseAdapter, query: str, limit: int, max_cache_age: float | None = None
+) -> list[ProductResult] | None:
+    """One platform's results within its deadline, or None if it failed."""
+    try:
+        results = await asyncio.wait_for(
+            _fetch_platform(adapter, query, limit, max_cache_age),
+            timeout=latency.deadline(adapter.platform.value),
+        )
+        logger.info(
+            f"{adapter.platform_name}: found {len(results)} results for '{query}'"
+        )
+        return results
+    except asyncio.TimeoutError:
+        logger.error(f"{adapter.platform_name}: timed out")
+    except CircuitOpenError as e:
+        logger.warning(str(e))
+    except Exception as e:
+        logger.error(f"{adapter.platform_name}: failed - {e}")
+    return None
+
+
+async def _finish(
+    query: str,
+    limit: int,
+    all_results: dict[str, list[ProductResult]],
+    platforms_failed: list[str],
+    platforms_pending: list[str],
+    start_time: float,
+    matched: list[MatchedProduct] | None = None,
+) -> SearchResponse:
+    """Match (unless already matched), build the response and cache it."""
+    if matched is None:
+        matched = await run_cpu(match_products, all_results)
 
     elapsed_ms = int((time.time() - start_time) * 1000)
 
-    # 4. Build response
     response = SearchResponse(
         query=query,
         results=matched,
         total_results=len(matched),
-        platforms_searched=platforms_searched,
+        platforms_searched=list(all_results),
         platforms_failed=platforms_failed,
+        platforms_pending=platforms_pending,
         cached=False,
         search_time_ms=elapsed_ms,
     )
 
-    # 5. Cache results (only if at least one platform succeeded)
-    if platforms_searched:
-        cache.set_cached(query, response)
+    # Cache the merged response only when every platform answered; after a
+    # partial failure the per-platform cache lets a retry re-fetch just the
+    # platforms that failed (or pick up late ones that have since landed)
+    if all_results and not platforms_failed and not platforms_pending:
+        await cache.set_cached(query, limit, response)
 
     return response
+
+
+async def _search_uncached(
+    query: str,
+    limit: int,
+    platform_slot: PlatformSlot | None = None,
+    platform_max_age: dict[str, float] | None = None,
+) -> SearchResponse:
+    """
+    Fan out to every adapter, match and cache. Bypasses the response cache.
+
+    Used by the prewarmer: platform_slot, if given, is entered around each
+    platform's call (to keep within its per-platform budget), and
+    platform_max_age caps how old a reused platform cache entry may be.
+    """
+    start_time = time.time()
+    # Platforms are searched for the cleaned-up query ("maybeline" -> "maybelline")
+    text = canonicalize(query).text
+
+    async def _platform(adapter: BaseAdapter) -> list[ProductResult] | None:
+        max_age = (platform_max_age or {}).get(adapter.platform.value)
+        if platform_slot is None:
+            return await _search_platform(adapter, text, limit, max_age)
+        async with platform_slot(adapter.platform.value):
+            return await _search_platform(adapter, text, limit, max_age)
+
+    # Run all adapters concurrently, within the response budget if one is set
+    tasks = {asyncio.create_task(_platform(a)): a for a in ADAPTERS}
+    budget = settings.search_response_budget_ms / 1000 or None
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+
+    all_results: dict[str, list[ProductResult]] = {}
+    platforms_failed: list[str] = []
+    for task, adapter in tasks.items():
+        if task in done:
+            results = task.result()
+            if results is None:
+                platforms_failed.append(adapter.platform.value)
+            else:
+                all_results[adapter.platform.value] = results
+
+    # Late platforms keep fetching in the background and fill the platform
+    # cache; only this response stops waiting for them
+    platforms_pending = [tasks[t].platform.value for t in pending]
+    for task in pending:
+        task.cancel()
+    if platforms_pending:
+        logger.info(f"Response budget spent; pending: {platforms_pending}")
+
+    return await _finish(query, limit, all_results, platforms_failed, platforms_pending, start_time)
+
+
+async def prewarm_search(query: str, limit: int, platform_slot: PlatformSlot) -> SearchResponse:
+    """
+    Refresh a query's cached response ahead of expiry. Joins an identical
+    search already in flight rather than starting a second one; not logged.
+
+    The refreshed response counts as fresh for the soft TTL, so a platform
+    cache entry is only reused if it stays within its platform's TTL for
+    that long; older ones (all of Amazon's, by default) are fetched live.
+    """
+    key = (cache.make_key(query), limit)
+    max_ages = {
+        a.platform.value: cache.platform_ttl(a.platform.value) - settings.cache_soft_ttl_seconds
+        for a in ADAPTERS
+    }
+    return await _search_flight.do(
+        key, lambda: _search_uncached(query, limit, platform_slot, max_ages)
+    )
+
+
+async def _streamed_search(
+    query: str, limit: int, emit: Callable[[BaseModel], None]
+) -> SearchResponse:
+    """Fan out like _search_uncached, emitting each platform's results and the regrouped products."""
+    start_time = time.time()
+    text = canonicalize(query).text
+
+    async def _platform(adapter: BaseAdapter):
+        return adapter, await _search_platform(adapter, text, limit)
+
+    tasks = [asyncio.create_task(_platform(a)) for a in ADAPTERS]
+    all_results: dict[str, list[ProductResult]] = {}
+    platforms_failed: list[str] = []
+    matched: list[MatchedProduct] = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            adapter, results = await next_done
+            platform = adapter.platform.value
+            if results is None:
+                platforms_failed.append(platform)
+                emit(PlatformResults(platform=platform, failed=True))
+                continue
+
+            all_results[platform] = results
+            emit(PlatformResults(platform=platform, results=results))
+            matched = await run_cpu(match_products, all_results)
+            emit(MatchUpdate(results=matched, platforms_searched=list(all_results)))
+    finally:
+        # Shared platform calls still finish and fill the cache
+        for task in tasks:
+            task.cancel()
+
+    return await _finish(query, limit, all_results, platforms_failed, [], start_time, matched)
+
+
+async def stream_search(query: str, limit: int = 10) -> AsyncIterator[BaseModel]:
+    """
+    Search like search_products, yielding progress as it happens.
+
+    Yields a PlatformResults as each platform answers, a MatchUpdate with
+    the regrouped products after each one, and the final SearchResponse
+    last. A cached or catalog response is yielded on its own. The search is
+    coalesced with search_products: joining one already in flight yields
+    just its final response, and /search requests arriving meanwhile join
+    this one. A client going away stops the stream, not the shared search.
+    """
+    start_time = time.time()
+    key = (cache.make_key(query), limit)
+    stored = await _stored_answer(query, limit, key)
+    if stored:
+        _log_search(query, stored, start_time)
+        yield stored
+        return
+
+    progress: asyncio.Queue[BaseModel | None] = asyncio.Queue()
+    search = asyncio.ensure_future(
+        _search_flight.do(key, lambda: _streamed_search(query, limit, progress.put_nowait))
+    )
+    search.add_done_callback(lambda _: progress.put_nowait(None))
+    try:
+        while (update := await progress.get()) is not None:
+            yield update
+        response = search.result()
+    finally:
+        # Only stops this waiter; the shared search is shielded
+        search.cancel()
+
+    if response.query != query:
+        # Joined a search started for a variant of this query
+        response = response.model_copy(update={"query": query})
+    _log_search(query, response, start_time)
+    yield response
+
+
+def get_inflight_stats() -> dict:
+    """Return request-coalescing statistics."""
+    return {
+        "searches": _search_flight.stats(),
+        "platform_calls": _adapter_flight.stats(),
+    }
+
+
+def get_platform_health() -> dict:
+    """Return circuit-breaker state per platform."""
+    return {a.platform.value: get_breaker(a.platform.value).snapshot() for a in ADAPTERS}
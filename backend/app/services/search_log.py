@@ -0,0 +1,42 @@
+import logging
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from app.config import get_settings
+from app.models.database import SearchLog, async_session
+from app.services.batch_writer import BatchWriter
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+async def _write_search_logs(rows: list[dict]) -> None:
+    """Insert a batch of search log rows in one executemany."""
+    async with async_session() as session:
+        await session.execute(insert(SearchLog), rows)
+        await session.commit()
+
+
+search_log_writer: BatchWriter[dict] = BatchWriter(
+    "search_log",
+    _write_search_logs,
+    max_batch=settings.log_batch_size,
+    flush_interval=settings.log_flush_seconds,
+    max_queue=settings.log_queue_size,
+)
+
+
+def record_search(
+    query: str, canonical_query: str, results_count: int, response_time_ms: int
+) -> None:
+    """Queue a SearchLog row; never waits on the database."""
+    search_log_writer.submit(
+        {
+            "query": query.strip()[:500],
+            "canonical_query": canonical_query[:500],
+            "results_count": results_count,
+            "response_time_ms": response_time_ms,
+            "timestamp": datetime.utcnow(),
+        }
+    )
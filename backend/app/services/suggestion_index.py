@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import re
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from app.config import get_settings
+from app.models.schemas import ProductResult
+from app.services.executor import run_cpu
+from app.utils.text import normalize_text
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Term weights: curated terms outrank harvested product names
+WEIGHT_CURATED = 3
+WEIGHT_BRAND = 2
+WEIGHT_HARVESTED = 1
+
+# Fuzzy scoring only looks at the terms sharing the most n-grams with the query
+FUZZY_CANDIDATES = 64
+FUZZY_CUTOFF = 50
+
+# Sorts after every character, closing the bisect range of a prefix
+_MAX_CHAR = chr(0x10FFFF)
+_EMPTY = np.array([], dtype=np.int32)
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _ngrams(text: str, n: int = 3) -> set[str]:
+    padded = f" {text} "
+    return {padded[i : i + n] for i in range(len(padded) - n + 1)}
+
+
+def spelling_buckets(words) -> dict[tuple[str, int], list[str]]:
+    """Alphabetic words grouped by first letter and length (spelling-correction candidates)."""
+    buckets: dict[tuple[str, int], list[str]] = {}
+    for word in words:
+        if word.isalpha():
+            buckets.setdefault((word[0], len(word)), []).append(word)
+    return buckets
+
+
+class SuggestionIndex:
+    """
+    Immutable autocomplete index over normalized terms.
+
+    - prefix:  sorted array of terms, bisected for the query's range
+    - in-word: sorted array of every word-start suffix ("lipstick" for
+               "mac lipstick"), bisected the same way
+    - fuzzy:   trigram postings narrow the candidates rapidfuzz scores
+
+    Ranking follows the old linear scan: prefix hits, then in-word hits
+    (word starts before mid-word substrings), then fuzzy scores; heavier
+    terms first within a tier.
+    """
+
+    def __init__(self, entries: list[tuple[str, int]]):
+        self.terms: list[str] = []
+        self.normalized: list[str] = []
+        seen: set[str] = set()
+        # Ids are assigned in rank order (heavier first, then first seen), so
+        # "best" is always "smallest id" and ranking is a sort of int arrays
+        for term, _ in sorted(entries, key=lambda e: -e[1]):
+            norm = normalize_text(term)
+            if not norm or norm in seen:
+                continue
+            seen.add(norm)
+            self.terms.append(term.strip())
+            self.normalized.append(norm)
+
+        # Every word of every term: the lexicon query spelling is checked against
+        self.vocabulary: frozenset[str] = frozenset(
+            word for norm in self.normalized for word in _WORD.findall(norm)
+        )
+        # Built here, in the build thread, so query spelling never pays for it
+        self.spelling_buckets = spelling_buckets(self.vocabulary)
+
+        order = sorted(range(len(self.normalized)), key=self.normalized.__getitem__)
+        self._prefix_sorted = [self.normalized[i] for i in order]
+        self._prefix_ids = np.array(order, dtype=np.int32)
+
+        word_starts: list[tuple[str, int]] = []
+        for i, norm in enumerate(self.normalized):
+            pos = norm.find(" ")
+            while pos != -1:
+                word_starts.append((norm[pos + 1 :], i))
+                pos = norm.find(" ", pos + 1)
+        word_starts.sort()
+        self._word_sorted = [suffix for suffix, _ in word_starts]
+        self._word_ids = np.array([i for _, i in word_starts], dtype=np.int32)
+
+        postings: dict[str, list[int]] = {}
+        for i, norm in enumerate(self.normalized):
+            for gram in _ngrams(norm):
+                postings.setdefault(gram, []).append(i)
+        # Sorted id arrays: intersections and overlap counts stay in NumPy
+        self._postings = {g: np.array(ids, dtype=np.int32) for g, ids in postings.items()}
+        self._gram_counts = np.array([len(_ngrams(n)) for n in self.normalized], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    @staticmethod
+    def _range(keys: list[str], prefix: str) -> tuple[int, int]:
+        start = bisect_left(keys, prefix)
+        return start, bisect_left(keys, prefix + _MAX_CHAR, start)
+
+    @staticmethod
+    def _take(ids: np.ndarray, limit: int, taken: list[int], accept=None) -> None:
+        """Append the best (smallest) unseen ids to taken, up to limit in total."""
+        for i in np.unique(ids).tolist():
+            if len(taken) >= limit:
+                return
+            if i not in taken and (accept is None or accept(i)):
+                taken.append(i)
+
+    def lookup(self, query: str, limit: int = 8) -> list[str]:
+        """Return up to limit terms for a partial query, best first."""
+        q = normalize_text(query)
+        if not q or not self.terms:
+            return []
+
+        # 1. Term starts with the query
+        found: list[int] = []
+        start, end = self._range(self._prefix_sorted, q)
+        self._take(self._prefix_ids[start:end], limit, found)
+
+        # 2. Query starts at a word boundary inside the term
+        if len(found) < limit:
+            start, end = self._range(self._word_sorted, q)
+            self._take(self._word_ids[start:end], limit, found)
+
+        # 3. Query occurs anywhere inside the term
+        if len(found) < limit:
+            normalized = self.normalized
+            self._take(
+                self._substring_candidates(q), limit, found, accept=lambda i: q in normalized[i]
+            )
+
+        # 4. Close enough by fuzzy score
+        if len(found) < limit:
+            found += self._fuzzy(q, limit - len(found), set(found))
+
+        return [self.terms[i] for i in found]
+
+    def _substring_candidates(self, q: str) -> np.ndarray:
+        """Ids of terms that may contain q (a superset; callers verify)."""
+        inner = [g for g in _ngrams(q) if g.strip() == g]
+        if inner:
+            # Every inner trigram of q must occur in the term
+            lists = sorted((self._postings.get(g, _EMPTY) for g in inner), key=len)
+            ids = lists[0]
+            for other in lists[1:]:
+                if not len(ids):
+                    break
+                ids = np.intersect1d(ids, other, assume_unique=True)
+            return ids
+        # One or two characters: any trigram containing them
+        lists = [ids for g, ids in self._postings.items() if q in g]
+        return np.unique(np.concatenate(lists)) if lists else _EMPTY
+
+    def _fuzzy(self, q: str, limit: int, exclude: set[int]) -> list[int]:
+        lists = [self._postings[g] for g in _ngrams(q) if g in self._postings]
+        if not lists:
+            return []
+        overlap = np.bincount(np.concatenate(lists), minlength=len(self.terms))
+        # Trigram Jaccard similarity, so short close terms beat long names
+        # that merely contain the query's grams
+        similarity = overlap / (len(lists) + self._gram_counts - overlap)
+        top = min(FUZZY_CANDIDATES + len(exclude), np.count_nonzero(overlap))
+        best = np.argpartition(similarity, -top)[-top:]
+        candidates = {int(i): self.normalized[i] for i in best if int(i) not in exclude}
+        scored = process.extract(
+            q, candidates, scorer=fuzz.token_sort_ratio, score_cutoff=FUZZY_CUTOFF, limit=None
+        )
+        # rapidfuzz returns (choice, score, key); order by score, then rank
+        scored.sort(key=lambda m: (-m[1], m[2]))
+        return [m[2] for m in scored[:limit]]
+
+
+class SuggestionIndexManager:
+    """
+    Holds the live index and rebuilds it off the event loop.
+
+    Readers always see a complete index: a rebuild constructs a new one
+    and swaps the reference. Product and brand names harvested from search
+    results are folded in once enough new ones have accumulated, at most
+    once per rebuild interval: a build is seconds of GIL-holding work on a
+    CPU executor slot the matcher also needs.
+    """
+
+    def __init__(self) -> None:
+        self._index = SuggestionIndex([])
+        self._base: list[tuple[str, int]] = []
+        self._harvested: OrderedDict[str, int] = OrderedDict()
+        self._pending = 0
+        self._rebuild_task: asyncio.Task | None = None
+        self._built_at = float("-inf")  # time.monotonic() of the last build
+        self._builds = 0
+
+    @property
+    def index(self) -> SuggestionIndex:
+        return self._index
+
+    def lookup(self, query: str, limit: int = 8) -> list[str]:
+        return self._index.lookup(query, limit)
+
+    async def build(self, base: list[tuple[str, int]] | None = None) -> None:
+        """(Re)build from the base terms plus everything harvested so far."""
+        if base is not None:
+            self._base = base
+        self._pending = 0
+        entries = self._base + list(self._harvested.items())
+        index = await run_cpu(SuggestionIndex, entries)
+        self._index = index
+        self._built_at = time.monotonic()
+        self._builds += 1
+        logger.info(f"Suggestion index built: {len(index)} terms")
+
+    def harvest(self, results: list[ProductResult]) -> None:
+        """Remember product and brand names seen in search results."""
+        cap = settings.suggestion_index_max_terms
+        for r in results:
+            for term, weight in ((r.brand, WEIGHT_BRAND), (r.name, WEIGHT_HARVESTED)):
+                if not term:
+                    continue
+                if term in self._harvested:
+                    self._harvested.move_to_end(term)
+                    continue
+                self._harvested[term] = weight
+                self._pending += 1
+                if len(self._harvested) > cap:
+                    self._harvested.popitem(last=False)
+
+        if self._pending >= settings.suggestion_index_rebuild_after and (
+            self._rebuild_task is None or self._rebuild_task.done()
+        ):
+            self._rebuild_task = asyncio.create_task(self._rebuild())
+
+    async def _rebuild(self) -> None:
+        # Names harvested while waiting are picked up by this same build
+        wait = self._built_at + settings.suggestion_index_rebuild_interval - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        try:
+            await self.build()
+        except Exception as e:
+            logger.warning(f"Suggestion index rebuild failed: {e}")
+
+    async def close(self) -> None:
+        if self._rebuild_task is not None and not self._rebuild_task.done():
+            self._rebuild_task.cancel()
+            try:
+                await self._rebuild_task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "terms": len(self._index),
+            "harvested": len(self._harvested),
+            "pending": self._pending,
+            "builds": self._builds,
+        }
+
+
+suggestion_index = SuggestionIndexManager()
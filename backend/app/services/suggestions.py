@@ -1,18 +1,33 @@
+import asyncio
 import logging
-import hashlib
-from cachetools import TTLCache
-from curl_cffi.requests import AsyncSession
-from rapidfuzz import fuzz
 from sqlalchemy import select, func
 
+from app.adapters.throttle import get_throttle, request_deadline
 from app.config import get_settings
 from app.models.database import async_session, SearchLog
+from app.models.schemas import Platform
+from app.services.prefix_cache import PrefixCache
+from app.services.search import get_adapter
+from app.services.suggestion_index import WEIGHT_BRAND, WEIGHT_CURATED, suggestion_index
+from app.utils.text import KNOWN_BRANDS, normalize_text
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-# Suggestions cache: 30 min TTL, 200 entries
-_suggestions_cache: TTLCache = TTLCache(maxsize=200, ttl=1800)
+# Outbound budget for Nykaa autocomplete (rates set alongside the platforms'),
+# and the longest a suggestion request may wait for it
+SUGGESTION_THROTTLE = "nykaa_suggest"
+SUGGESTION_QUEUE_SECONDS = 0.5
+
+# Suggestion pools per normalized prefix: 30 min TTL, empty results 1 min
+_suggestions_cache = PrefixCache(
+    maxsize=settings.suggestion_cache_size,
+    ttl=settings.suggestion_cache_ttl_seconds,
+    negative_ttl=settings.suggestion_negative_ttl_seconds,
+)
+
+# Remote calls that missed the deadline but still fill the cache
+_late_remote: set[asyncio.Task] = set()
 
 POPULAR_TERMS = [
     "Maybelline Fit Me Foundation",
@@ -131,78 +146,49 @@ TRENDING = [
 ]
 
 
-def _cache_key(query: str) -> str:
-    return hashlib.md5(query.lower().strip().encode()).hexdigest()
-
-
-async def _fetch_nykaa_suggestions(query: str) -> list[str]:
-    """Fetch autocomplete suggestions from Nykaa's search API."""
+async def _fetch_nykaa_suggestions(query: str) -> list[str] | None:
+    """Fetch autocomplete suggestions from Nykaa's search API; None if the call failed."""
+    # Suggestions have their own Nykaa budget, separate from search, and never
+    # queue for long: a late suggestion is useless
+    deadline = request_deadline.set(asyncio.get_running_loop().time() + SUGGESTION_QUEUE_SECONDS)
     try:
-        async with AsyncSession(impersonate="chrome131") as s:
-            resp = await s.get(
+        # Reuse the Nykaa adapter's pooled session (same host, warm connections)
+        session = get_adapter(Platform.NYKAA).get_session()
+        async with get_throttle(SUGGESTION_THROTTLE).slot():
+            resp = await session.get(
                 "https://www.nykaa.com/gateway-api/search/elastic/auto-suggest",
                 params={"q": query, "searchType": "Manual"},
-                timeout=5,
+                timeout=settings.suggestion_remote_timeout,
             )
-            if resp.status_code != 200:
-                logger.debug(f"Nykaa suggestions returned {resp.status_code}")
-                return []
-
-            data = resp.json()
-            suggestions = []
-            # The response typically has a "suggestions" or "categories" field
-            for item in data.get("response", {}).get("suggestions", []):
-                text = item.get("name") or item.get("text") or ""
-                if text:
-                    suggestions.append(text)
-            # Also check products in the response
-            for item in data.get("response", {}).get("products", []):
-                name = item.get("name") or item.get("title") or ""
-                if name:
-                    suggestions.append(name)
-            return suggestions[:8]
+        if resp.status_code != 200:
+            logger.debug(f"Nykaa suggestions returned {resp.status_code}")
+            return None
+
+        data = resp.json()
+        suggestions = []
+        # The response typically has a "suggestions" or "categories" field
+        for item in data.get("response", {}).get("suggestions", []):
+            text = item.get("name") or item.get("text") or ""
+            if text:
+                suggestions.append(text)
+        # Also check products in the response
+        for item in data.get("response", {}).get("products", []):
+            name = item.get("name") or item.get("title") or ""
+            if name:
+                suggestions.append(name)
+        return suggestions
     except Exception as e:
         logger.debug(f"Nykaa suggestions error: {e}")
-        return []
+        return None
+    finally:
+        request_deadline.reset(deadline)
 
 
-def _match_popular_terms(query: str, limit: int = 8) -> list[str]:
-    """Match query against popular beauty terms using prefix, substring, and fuzzy matching."""
-    q_lower = query.lower().strip()
-    matched_terms = set()
-    matches = []
-
-    # Prefix matches (highest priority)
-    for term in POPULAR_TERMS:
-        if term.lower().startswith(q_lower):
-            matches.append((term, 100))
-            matched_terms.add(term)
-
-    # Substring / word-prefix matches (e.g. "lip" matches "MAC Lipstick")
-    for term in POPULAR_TERMS:
-        if term in matched_terms:
-            continue
-        t_lower = term.lower()
-        if q_lower in t_lower:
-            matches.append((term, 90))
-            matched_terms.add(term)
-        else:
-            # Check if query matches start of any word in the term
-            words = t_lower.split()
-            if any(w.startswith(q_lower) for w in words):
-                matches.append((term, 85))
-                matched_terms.add(term)
-
-    # Fuzzy matches (lower priority)
-    for term in POPULAR_TERMS:
-        if term in matched_terms:
-            continue
-        score = fuzz.token_sort_ratio(q_lower, term.lower())
-        if score >= 50:
-            matches.append((term, score))
-
-    matches.sort(key=lambda x: x[1], reverse=True)
-    return [m[0] for m in matches[:limit]]
+async def build_suggestion_index() -> None:
+    """Build the autocomplete index from curated terms and the brand lexicon."""
+    base = [(term, WEIGHT_CURATED) for term in POPULAR_TERMS + TRENDING]
+    base += [(brand.title(), WEIGHT_BRAND) for brand in KNOWN_BRANDS]
+    await suggestion_index.build(base)
 
 
 async def _search_log_suggestions(query: str, limit: int = 5) -> list[str]:
@@ -225,44 +211,101 @@ async def _search_log_suggestions(query: str, limit: int = 5) -> list[str]:
         return []
 
 
+def _combine(sources: list[list[str]], limit: int) -> list[str]:
+    """Merge suggestion sources in priority order, deduplicated case-insensitively."""
+    seen = set()
+    combined = []
+
+    for source in sources:
+        for item in source:
+            normalized = item.strip().lower()
+            if normalized and normalized not in seen:
+                seen.add(normalized)
+                combined.append(item.strip())
+            if len(combined) >= limit:
+                return combined
+    return combined
+
+
+def _merge_late_remote(
+    key: str, task: asyncio.Task, popular: list[str], log_matches: list[str], pool: int
+) -> None:
+    """Fold remote suggestions that missed the deadline into the cache."""
+    _late_remote.discard(task)
+    if task.cancelled() or task.exception() is not None:
+        return
+    nykaa = task.result()
+    if nykaa:
+        _suggestions_cache.set(key, _combine([nykaa, popular, log_matches], pool))
+
+
 async def get_suggestions(query: str, limit: int = 8) -> list[str]:
-    """Get autocomplete suggestions from multiple sources, combined and deduplicated."""
+    """
+    Get autocomplete suggestions from multiple sources, combined and deduplicated.
+
+    Served from the prefix cache when the query, or a shorter prefix with
+    enough matching candidates, was seen recently. Otherwise the local
+    index answers at once; the search log and Nykaa's autocomplete run
+    concurrently and get until the suggestion deadline. A Nykaa answer that
+    arrives later is merged into the cache for the next keystroke.
+    """
     query = query.strip()
     if not query:
         return TRENDING[:limit]
 
-    # Check cache
-    key = _cache_key(query)
-    cached = _suggestions_cache.get(key)
+    # Check cache (exact query, then refinements of a cached prefix)
+    key = normalize_text(query)
+    cached = _suggestions_cache.find(key, limit)
     if cached is not None:
         return cached[:limit]
 
-    # Gather from all sources
-    nykaa = await _fetch_nykaa_suggestions(query)
-    popular = _match_popular_terms(query, limit)
-    log_matches = await _search_log_suggestions(query, limit)
+    # Gather from all sources; keep a pool deeper than one page so longer
+    # queries can be answered by filtering it
+    pool = max(limit, settings.suggestion_pool_size)
+    remote = asyncio.create_task(_fetch_nykaa_suggestions(query))
+    log = asyncio.create_task(_search_log_suggestions(query, pool))
+    popular = suggestion_index.lookup(query, pool)
+    try:
+        await asyncio.wait({remote, log}, timeout=settings.suggestion_deadline_ms / 1000)
+    except asyncio.CancelledError:
+        # Client went away: nobody will read the late answer either
+        remote.cancel()
+        log.cancel()
+        raise
 
-    # Combine with deduplication (case-insensitive)
-    seen = set()
-    combined = []
+    nykaa = (remote.result() if remote.done() else None) or []
+    if log.done():
+        log_matches = log.result()
+    else:
+        log.cancel()
+        log_matches = []
 
-    for source in [nykaa, popular, log_matches]:
-        for item in source:
-            normalized = item.strip().lower()
-            if normalized and normalized not in seen:
-                seen.add(normalized)
-                combined.append(item.strip())
-            if len(combined) >= limit:
-                break
-        if len(combined) >= limit:
-            break
+    combined = _combine([nykaa, popular, log_matches], pool)
 
-    # Cache the result
-    _suggestions_cache[key] = combined
+    # Cache the pool; an empty one only when Nykaa really answered nothing,
+    # since it answers every refinement of the query with nothing
+    if combined or (remote.done() and remote.result() is not None):
+        _suggestions_cache.set(key, combined)
+    if not remote.done():
+        _late_remote.add(remote)
+        remote.add_done_callback(
+            lambda task: _merge_late_remote(key, task, popular, log_matches, pool)
+        )
 
     return combined[:limit]
 
 
+def get_suggestion_cache_stats() -> dict:
+    return _suggestions_cache.stats()
+
+
+async def close_suggestions() -> None:
+    """Cancel remote suggestion calls still running after their request."""
+    for task in list(_late_remote):
+        task.cancel()
+    await asyncio.gather(*_late_remote, return_exceptions=True)
+
+
 def get_trending() -> list[str]:
     """Return trending search terms."""
     return list(TRENDING)
@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
+from app.utils.text import extract_brand, extract_shade, extract_size, normalize_text
+
+# Product names repeat across searches, platforms and the O(n^2) matcher;
+# bounded so a long-running worker doesn't grow without limit
+FEATURE_CACHE_SIZE = 8192
+
+
+@dataclass(frozen=True, slots=True)
+class TextFeatures:
+    """Everything the matcher and suggestions derive from a product name."""
+
+    normalized: str
+    brand: str  # display form, e.g. "Lakme" (first word if no known brand)
+    size: str  # e.g. "30ml", "" if absent
+    shade: str  # e.g. "128 Warm Nude", "" if absent
+
+
+@lru_cache(maxsize=FEATURE_CACHE_SIZE)
+def text_features(name: str) -> TextFeatures:
+    """Compute (once per distinct name) the text features of a product name."""
+    return TextFeatures(
+        normalized=normalize_text(name),
+        brand=extract_brand(name),
+        size=extract_size(name),
+        shade=extract_shade(name),
+    )
+
+
+def feature_cache_stats() -> dict:
+    info = text_features.cache_info()
+    total = info.hits + info.misses
+    return {
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": round(info.hits / total, 3) if total else 0.0,
+    }
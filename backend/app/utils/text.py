@@ -1,13 +1,20 @@
 import re
 import unicodedata
+from pathlib import Path
+
+_BRANDS_FILE = Path(__file__).resolve().parent.parent / "data" / "brands.txt"
+
+_NON_WORD = re.compile(r"[^\w\s\-.]")
+_WHITESPACE = re.compile(r"\s+")
+_NON_PRICE = re.compile(r"[^\d.]")
 
 
 def normalize_text(text: str) -> str:
     """Lowercase, strip, collapse whitespace, remove special chars."""
     text = text.lower().strip()
     text = unicodedata.normalize("NFKD", text)
-    text = re.sub(r"[^\w\s\-.]", "", text)
-    text = re.sub(r"\s+", " ", text)
+    text = _NON_WORD.sub("", text)
+    text = _WHITESPACE.sub(" ", text)
     return text
 
 
@@ -15,7 +22,7 @@ def clean_price(text: str) -> float:
     """Extract numeric price from strings like 'Rs. 1,299', '₹1299', 'MRP: 599.00'."""
     if not text:
         return 0.0
-    cleaned = re.sub(r"[^\d.]", "", str(text))
+    cleaned = _NON_PRICE.sub("", str(text))
     if not cleaned:
         return 0.0
     try:
@@ -24,21 +31,54 @@ def clean_price(text: str) -> float:
         return 0.0
 
 
+def _load_brands() -> list[str]:
+    lines = _BRANDS_FILE.read_text(encoding="utf-8").splitlines()
+    return [line.strip().lower() for line in lines if line.strip() and not line.startswith("#")]
+
+
+def _trie_pattern(words: list[str]) -> str:
+    """
+    One regex for a word list, factored as a trie ("m(?:a(?:c|rs)|...)") so
+    each position costs a single branch walk. Optional tails are greedy, so
+    the longest word starting at a position wins.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in node.items() if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+KNOWN_BRANDS = _load_brands()
+_BRAND_RANK = {brand: i for i, brand in enumerate(KNOWN_BRANDS)}
+# One pass over the text: the lookahead reports a match at every position,
+# overlapping ones included
+_BRAND_PATTERN = re.compile(f"(?=({_trie_pattern(KNOWN_BRANDS)}))")
+
+
+def find_brand(text: str) -> str:
+    """Return the longest known brand occurring in text (lowercase), or ''."""
+    found = set(_BRAND_PATTERN.findall(text.lower()))
+    if not found:
+        return ""
+    return min(found, key=lambda b: (-len(b), _BRAND_RANK[b]))
+
+
 def extract_brand(text: str) -> str:
     """Extract brand name (first word group before product line)."""
-    known_brands = [
-        "maybelline", "lakme", "mac", "nykaa", "sugar", "colorbar",
-        "neutrogena", "loreal", "garnier", "biotique", "mamaearth",
-        "plum", "minimalist", "cetaphil", "cerave", "the ordinary",
-        "innisfree", "forest essentials", "kama ayurveda", "dot & key",
-        "mars", "faces canada", "revlon", "elle 18", "blue heaven",
-        "himalaya", "nivea", "dove", "ponds", "olay", "simple",
-        "st. botanica", "wow", "mcaffeine", "re'equil", "derma co",
-    ]
-    text_lower = text.lower()
-    for brand in sorted(known_brands, key=len, reverse=True):
-        if brand in text_lower:
-            return brand.title()
+    brand = find_brand(text)
+    if brand:
+        return brand.title()
     # Fallback: first word
     parts = text.strip().split()
     return parts[0] if parts else ""
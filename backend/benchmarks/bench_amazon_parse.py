@@ -0,0 +1,139 @@
+"""
+Amazon search-page parsing: single-pass lxml card scan vs the previous
+per-field BeautifulSoup selectors (kept here as the reference).
+
+    cd backend && python -m benchmarks.bench_amazon_parse [saved_page.html ...]
+
+Without arguments a synthetic page is used. Both parsers must return the
+same ProductResult lists.
+"""
+
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from app.adapters.amazon import AmazonAdapter
+from app.models.schemas import Platform, ProductResult
+from app.utils.text import clean_price, compute_discount, extract_brand
+from benchmarks.synthetic import make_amazon_page
+
+ROUNDS = 10
+LIMIT = 30
+
+
+def legacy_parse_search_page(html: str, limit: int) -> list[ProductResult]:
+    soup = BeautifulSoup(html, "lxml")
+    results: list[ProductResult] = []
+    for card in soup.select('[data-component-type="s-search-result"]')[:limit * 2]:
+        result = _legacy_parse_card(card)
+        if result:
+            results.append(result)
+            if len(results) >= limit:
+                break
+    return results
+
+
+def _legacy_parse_card(card) -> ProductResult | None:
+    if card.select_one('[data-component-type="sp-sponsored-result"]'):
+        return None
+    sponsored_el = card.select_one('[class*="sponsored"], .puis-label-popover-default')
+    if sponsored_el and "ponsored" in (sponsored_el.get_text() or ""):
+        return None
+
+    name = ""
+    img_el = card.select_one("img.s-image")
+    if img_el:
+        name = img_el.get("alt", "").strip()
+    if not name or len(name) < 10:
+        h2_el = card.select_one("h2")
+        if h2_el:
+            name = h2_el.get_text(" ", strip=True)
+    if not name or len(name) < 10:
+        h2_link = card.select_one("h2 a")
+        if h2_link and h2_link.get("aria-label"):
+            name = h2_link.get("aria-label", "")
+    if not name or len(name) < 5:
+        return None
+
+    link_el = card.select_one("h2 a")
+    href = link_el.get("href", "") if link_el else ""
+    product_url = f"https://www.amazon.in{href}" if href and not href.startswith("http") else href
+
+    price = 0.0
+    price_el = card.select_one("span.a-price span.a-offscreen")
+    if price_el:
+        price = clean_price(price_el.get_text())
+    if price <= 0:
+        price_el = card.select_one(".a-price .a-price-whole")
+        if price_el:
+            price = clean_price(price_el.get_text())
+    if price <= 0:
+        return None
+
+    mrp = 0.0
+    mrp_el = card.select_one("span.a-price.a-text-price span.a-offscreen")
+    if mrp_el:
+        mrp = clean_price(mrp_el.get_text())
+    discount = compute_discount(price, mrp) if mrp > 0 else 0.0
+
+    img_el = card.select_one("img.s-image")
+    image_url = img_el.get("src", "") if img_el else ""
+
+    rating = 0.0
+    rating_el = card.select_one("span.a-icon-alt")
+    if rating_el:
+        match = re.search(r"([\d.]+)", rating_el.get_text())
+        if match:
+            rating = float(match.group(1))
+
+    rating_count = 0
+    count_el = card.select_one('span[aria-label*="ratings"]') or card.select_one(
+        ".a-size-base.s-underline-text"
+    )
+    if count_el:
+        match = re.search(r"([\d]+)", count_el.get_text().replace(",", ""))
+        if match:
+            rating_count = int(match.group(1))
+
+    return ProductResult(
+        name=name,
+        brand=extract_brand(name),
+        price=price,
+        mrp=mrp if mrp > 0 else price,
+        discount_percent=discount,
+        image_url=image_url,
+        product_url=product_url,
+        platform=Platform.AMAZON,
+        in_stock=True,
+        rating=rating,
+        rating_count=rating_count,
+    )
+
+
+def _median_ms(fn, page: str) -> tuple[float, list]:
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        result = fn(page, LIMIT)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main(paths: list[str]) -> None:
+    pages = [(p, Path(p).read_text(encoding="utf-8")) for p in paths]
+    pages = pages or [("synthetic", make_amazon_page())]
+    for name, page in pages:
+        legacy_ms, expected = _median_ms(legacy_parse_search_page, page)
+        fast_ms, got = _median_ms(AmazonAdapter._parse_search_page, page)
+        same = "same" if got == expected else "DIFFERENT"
+        print(f"{name}: {len(page) / 2**20:.2f} MiB, {len(got)} products ({same})")
+        print(f"  beautifulsoup selectors: {legacy_ms:8.2f} ms")
+        print(f"  lxml single pass:        {fast_ms:8.2f} ms  ({legacy_ms / fast_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,95 @@
+"""
+Cache keys for a stream of searches: lowercase/strip vs canonical form.
+
+    cd backend && python -m benchmarks.bench_canonical [searches]
+
+Searches are drawn from the popular terms with the variations users type:
+case and spacing, shuffled words, a dropped or doubled letter, "30 ml"
+for "30ml". The hit rate is that of an unbounded cache keyed each way.
+Product names that lead with a digit ("9to5", "24k") must survive intact;
+they are checked after the run.
+"""
+
+import random
+import sys
+import time
+
+from app.services import canonical
+from app.services.canonical import canonical_key, canonicalize
+from app.services.suggestion_index import WEIGHT_CURATED, SuggestionIndex, suggestion_index
+from app.services.suggestions import POPULAR_TERMS
+
+SEED = 7
+
+# query -> expected canonical text: digit-led names stay whole, units still join
+DIGIT_LED = {
+    "lakme 9to5 primer": "lakme 9to5 primer",
+    "24k gold serum": "24k gold serum",
+    "lakme absolute 3d": "lakme absolute 3d",
+    "nivea 1.50 LTR": "nivea 1.5l",
+    "serum 30 ML": "serum 30ml",
+}
+
+
+def _typo(word: str, rng: random.Random) -> str:
+    if len(word) < 6:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1 :] if rng.random() < 0.5 else word[:i] + word[i] + word[i:]
+
+
+def _variant(term: str, rng: random.Random) -> str:
+    words = term.split()
+    roll = rng.random()
+    if roll < 0.4:
+        return term
+    if roll < 0.55:
+        return f"  {term.upper() if rng.random() < 0.5 else term.lower()} "
+    if roll < 0.7:
+        rng.shuffle(words)
+    elif roll < 0.9:
+        i = rng.randrange(len(words))
+        words[i] = _typo(words[i], rng)
+    else:
+        words.append(f"{rng.choice([15, 30, 50, 100])} {rng.choice(['ml', 'ML', 'gm'])}")
+    return " ".join(words)
+
+
+def _hit_rate(keys: list[str]) -> float:
+    seen: set[str] = set()
+    hits = 0
+    for key in keys:
+        hits += key in seen
+        seen.add(key)
+    return hits / len(keys) * 100
+
+
+def main(searches: int) -> None:
+    rng = random.Random(SEED)
+    # Zipf-ish traffic: the head of the list is searched most
+    weights = [1 / (rank + 1) for rank in range(len(POPULAR_TERMS))]
+    stream = [_variant(t, rng) for t in rng.choices(POPULAR_TERMS, weights, k=searches)]
+
+    suggestion_index._index = SuggestionIndex([(t, WEIGHT_CURATED) for t in POPULAR_TERMS])
+
+    legacy = [q.lower().strip() for q in stream]
+    start = time.perf_counter()
+    keys = [canonical_key(q) for q in stream]
+    elapsed = time.perf_counter() - start
+    info = canonical._canonical_key.cache_info()
+
+    print(f"{searches} searches over {len(POPULAR_TERMS)} terms")
+    print(f"  lowercase keys: {len(set(legacy)):6} distinct, hit rate {_hit_rate(legacy):5.1f}%")
+    print(f"  canonical keys: {len(set(keys)):6} distinct, hit rate {_hit_rate(keys):5.1f}%")
+    print(
+        f"  canonical_key: {elapsed / searches * 1e6:.1f} us/search "
+        f"({info.misses} computed, {info.hits} memoized)"
+    )
+
+    for query, expected in DIGIT_LED.items():
+        text = canonicalize(query).text
+        print(f"  {query!r:24} -> {text!r}{'' if text == expected else f'  (expected {expected!r})'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,61 @@
+"""
+Compare greedy and optimal product grouping on synthetic catalogs.
+
+    cd backend && python -m benchmarks.bench_matcher
+
+Quality is pairwise precision/recall against the catalog's ground truth,
+plus how many groups hold two listings from the same platform.
+"""
+
+import statistics
+import time
+from itertools import combinations
+
+from app.services.matcher import match_products
+from benchmarks.synthetic import make_catalog
+
+SIZES = [10, 30, 50]  # products per platform
+SEEDS = range(10)
+
+
+def _pairs(groups: list[list[int]]) -> set[tuple[int, int]]:
+    return {tuple(sorted(pair)) for group in groups for pair in combinations(group, 2)}
+
+
+def _quality(matched, truth: dict[int, int]) -> tuple[float, float, int]:
+    predicted = [[id(p) for p in m.prices] for m in matched]
+    by_base: dict[int, list[int]] = {}
+    for product_id, base_id in truth.items():
+        by_base.setdefault(base_id, []).append(product_id)
+
+    got, want = _pairs(predicted), _pairs(list(by_base.values()))
+    precision = len(got & want) / len(got) if got else 1.0
+    recall = len(got & want) / len(want) if want else 1.0
+    violations = sum(
+        len(m.prices) != len({p.platform for p in m.prices}) for m in matched
+    )
+    return precision, recall, violations
+
+
+def main() -> None:
+    print(f"{'per platform':>12} {'mode':>8} {'ms mean':>8} {'ms max':>8} "
+          f"{'precision':>9} {'recall':>7} {'same-platform groups':>21}")
+    for size in SIZES:
+        for mode in ("greedy", "optimal"):
+            times, precisions, recalls, violations = [], [], [], 0
+            for seed in SEEDS:
+                results, truth = make_catalog(per_platform=size, seed=seed)
+                start = time.perf_counter()
+                matched = match_products(results, mode=mode)
+                times.append((time.perf_counter() - start) * 1000)
+                p, r, v = _quality(matched, truth)
+                precisions.append(p)
+                recalls.append(r)
+                violations += v
+            print(f"{size:>12} {mode:>8} {statistics.mean(times):>8.2f} {max(times):>8.2f} "
+                  f"{statistics.mean(precisions):>9.3f} {statistics.mean(recalls):>7.3f} "
+                  f"{violations:>21}")
+
+
+if __name__ == "__main__":
+    main()
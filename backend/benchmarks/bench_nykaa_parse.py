@@ -0,0 +1,66 @@
+"""
+Nykaa search-page parsing: byte-level state extraction vs full DOM parse.
+
+    cd backend && python -m benchmarks.bench_nykaa_parse [saved_page.html ...]
+
+Without arguments a synthetic page is used. Saved pages (curl the search
+URL into a file) give the numbers that matter.
+"""
+
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from app.adapters import nykaa
+from app.adapters.nykaa import NykaaAdapter
+from benchmarks.synthetic import make_nykaa_page
+
+ROUNDS = 20
+LIMIT = 30
+
+
+def _measure(fn, page: bytes) -> tuple[float, float, list]:
+    """Return (median ms, peak MiB, result) for fn(page, LIMIT)."""
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        result = fn(page, LIMIT)
+        times.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn(page, LIMIT)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak / 2**20, result
+
+
+def _fast_no_orjson(page: bytes, limit: int) -> list:
+    saved, nykaa.orjson = nykaa.orjson, None
+    try:
+        return NykaaAdapter._parse_search_page(page, limit)
+    finally:
+        nykaa.orjson = saved
+
+
+def main(paths: list[str]) -> None:
+    pages = [(p, Path(p).read_bytes()) for p in paths] or [("synthetic", make_nykaa_page())]
+    variants = [
+        ("beautifulsoup", NykaaAdapter._parse_search_page_soup),
+        ("fast path", NykaaAdapter._parse_search_page),
+        ("fast, no orjson", _fast_no_orjson),
+    ]
+
+    for name, page in pages:
+        print(f"{name}: {len(page) / 2**20:.2f} MiB")
+        baseline = None
+        for label, fn in variants:
+            ms, peak, result = _measure(fn, page)
+            baseline = result if baseline is None else baseline
+            same = "same" if result == baseline else "DIFFERENT"
+            print(f"  {label:>15}: {ms:8.2f} ms  peak {peak:7.2f} MiB  "
+                  f"{len(result)} products ({same})")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
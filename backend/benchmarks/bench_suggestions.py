@@ -0,0 +1,72 @@
+"""
+Autocomplete lookups: the old three-pass linear scan vs the suggestion index.
+
+    cd backend && python -m benchmarks.bench_suggestions [per_platform]
+
+Synthetic product names stand in for harvested search results. The
+default size fills the index to about suggestion_index_max_terms, so the
+build time printed is what one background rebuild costs.
+"""
+
+import statistics
+import sys
+import time
+
+from rapidfuzz import fuzz
+
+from app.services.suggestion_index import WEIGHT_CURATED, WEIGHT_HARVESTED, SuggestionIndex
+from app.services.suggestions import POPULAR_TERMS
+from benchmarks.synthetic import make_catalog
+
+QUERIES = ["m", "may", "lakme kaj", "stick", "sunscrn", "face wash neut", "charlote"]
+ROUNDS = 50
+
+
+def _legacy(terms: list[str], query: str, limit: int = 8) -> list[str]:
+    q = query.lower().strip()
+    matched, matches = set(), []
+    for term in terms:
+        if term.lower().startswith(q):
+            matches.append((term, 100))
+            matched.add(term)
+    for term in terms:
+        if term not in matched and q in term.lower():
+            matches.append((term, 90))
+            matched.add(term)
+    for term in terms:
+        if term not in matched:
+            score = fuzz.token_sort_ratio(q, term.lower())
+            if score >= 50:
+                matches.append((term, score))
+    matches.sort(key=lambda x: x[1], reverse=True)
+    return [m[0] for m in matches[:limit]]
+
+
+def _median_ms(fn) -> float:
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main(per_platform: int) -> None:
+    catalog, _ = make_catalog(per_platform)
+    names = [p.name for results in catalog.values() for p in results]
+    terms = POPULAR_TERMS + names
+
+    start = time.perf_counter()
+    index = SuggestionIndex(
+        [(t, WEIGHT_CURATED) for t in POPULAR_TERMS] + [(n, WEIGHT_HARVESTED) for n in names]
+    )
+    print(f"{len(index)} terms, index built in {time.perf_counter() - start:.2f} s")
+
+    for q in QUERIES:
+        legacy = _median_ms(lambda: _legacy(terms, q))
+        indexed = _median_ms(lambda: index.lookup(q))
+        print(f"  {q!r:>18}: linear {legacy:8.3f} ms   index {indexed:6.3f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 6500)
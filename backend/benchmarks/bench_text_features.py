@@ -0,0 +1,70 @@
+"""
+Per-name text features: the old per-call regex/brand-list code vs the
+precompiled pipeline, cold and memoized.
+
+    cd backend && python -m benchmarks.bench_text_features [per_platform]
+"""
+
+import re
+import statistics
+import sys
+import time
+import unicodedata
+
+from app.utils.features import text_features
+from app.utils.text import KNOWN_BRANDS, extract_shade, extract_size
+from benchmarks.synthetic import make_catalog
+
+ROUNDS = 20
+
+
+def _legacy_normalize(text: str) -> str:
+    text = text.lower().strip()
+    text = unicodedata.normalize("NFKD", text)
+    text = re.sub(r"[^\w\s\-.]", "", text)
+    return re.sub(r"\s+", " ", text)
+
+
+def _legacy_brand(text: str) -> str:
+    known_brands = list(KNOWN_BRANDS)  # rebuilt per call, as before
+    text_lower = text.lower()
+    for brand in sorted(known_brands, key=len, reverse=True):
+        if brand in text_lower:
+            return brand.title()
+    parts = text.strip().split()
+    return parts[0] if parts else ""
+
+
+def _legacy(names: list[str]) -> list:
+    return [(_legacy_normalize(n), _legacy_brand(n), extract_size(n), extract_shade(n)) for n in names]
+
+
+def _cold(names: list[str]) -> list:
+    text_features.cache_clear()
+    return [(f.normalized, f.brand, f.size, f.shade) for f in map(text_features, names)]
+
+
+def _warm(names: list[str]) -> list:
+    return [(f.normalized, f.brand, f.size, f.shade) for f in map(text_features, names)]
+
+
+def main(per_platform: int) -> None:
+    catalog, _ = make_catalog(per_platform)
+    names = [p.name for results in catalog.values() for p in results]
+    # The matcher looks each name up once per search; repeated searches
+    # and overlapping queries see the same names again
+    print(f"{len(names)} names")
+    baseline = None
+    for label, fn in [("legacy", _legacy), ("precompiled", _cold), ("memoized", _warm)]:
+        times = []
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            result = fn(names)
+            times.append((time.perf_counter() - start) * 1000)
+        baseline = result if baseline is None else baseline
+        same = "same" if result == baseline else "DIFFERENT"
+        print(f"  {label:>12}: {statistics.median(times):8.3f} ms ({same})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
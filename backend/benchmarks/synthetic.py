@@ -0,0 +1,170 @@
+"""Synthetic fixtures for the benchmarks: catalogs with known ground truth."""
+
+import json
+import random
+
+from app.models.schemas import Platform, ProductResult
+
+BRANDS = [
+    "Maybelline", "Lakme", "MAC", "L'Oreal Paris", "The Ordinary", "Minimalist",
+    "Nykaa", "Sugar", "Plum", "Cetaphil", "Mamaearth", "Neutrogena",
+]
+LINES = [
+    "Fit Me Matte Poreless Foundation", "Ruby Woo Lipstick", "Eyeconic Kajal",
+    "Niacinamide 10% Zinc 1% Serum", "Salicylic Acid 2% Face Serum",
+    "Hydrating Cleanser", "Matte As Hell Crayon Lipstick", "Green Tea Face Wash",
+    "Colossal Mascara", "Vitamin C Serum", "Ultra Light Sunscreen SPF 50",
+    "Onion Hair Oil",
+]
+SIZES = ["30ml", "30 ml", "50ml", "100ml", "4g", "3.5g", "200 ml", "", ""]
+NOISE = ["(Nude)", "- Pack of 1", "for Women", "Shade 128", "| Lightweight"]
+
+
+def _noisy(name: str, rng: random.Random) -> str:
+    """Reword a product title the way different platforms list it."""
+    words = name.split()
+    if rng.random() < 0.3:
+        rng.shuffle(words)
+    if rng.random() < 0.3:
+        words = words[:-1]
+    if rng.random() < 0.3:
+        words.append(rng.choice(NOISE))
+    return " ".join(words)
+
+
+def make_catalog(
+    per_platform: int = 30, n_base: int | None = None, seed: int = 0
+) -> tuple[dict[str, list[ProductResult]], dict[int, int]]:
+    """
+    Build per-platform result lists drawn from one set of base products.
+
+    Returns the results and a map of id(ProductResult) -> base product id,
+    so groupings can be scored against the truth.
+    """
+    rng = random.Random(seed)
+    n_base = n_base or int(per_platform * 1.5)
+    base = []
+    for i in range(n_base):
+        brand = rng.choice(BRANDS)
+        name = f"{brand} {rng.choice(LINES)} {rng.choice(SIZES)}".strip()
+        base.append((i, name, brand, rng.uniform(150, 2500)))
+
+    results: dict[str, list[ProductResult]] = {}
+    truth: dict[int, int] = {}
+    for platform in Platform:
+        listing = []
+        for i, name, brand, price in rng.sample(base, min(per_platform, n_base)):
+            product = ProductResult(
+                name=_noisy(name, rng),
+                brand=brand if rng.random() < 0.7 else "",
+                price=round(price * rng.uniform(0.85, 1.15), 2),
+                platform=platform,
+            )
+            truth[id(product)] = i
+            listing.append(product)
+        results[platform.value] = listing
+    return results, truth
+
+
+def make_nykaa_page(n_products: int = 20, seed: int = 0, filler_items: int = 4000) -> bytes:
+    """
+    A Nykaa search page shaped like the real one: a large DOM plus a
+    __PRELOADED_STATE__ script whose listing sits among other app state.
+    """
+    rng = random.Random(seed)
+    products = []
+    for i in range(n_products):
+        brand = rng.choice(BRANDS)
+        price = rng.randint(150, 2500)
+        products.append({
+            "id": str(100000 + i),
+            "name": f"{brand} {rng.choice(LINES)} {rng.choice(SIZES)}".strip(),
+            "brandName": brand,
+            "price": price,
+            "mrp": int(price * rng.uniform(1.0, 1.4)),
+            "imageUrl": f"https://images-static.nykaa.com/media/catalog/product/{i}.jpg",
+            "slug": f"product-{i}/p/{100000 + i}",
+            "rating": round(rng.uniform(3, 5), 1),
+            "rating_count": rng.randint(0, 20000),
+            "inStock": True,
+            "description": "<p>Long \"quoted\" description with {braces} and </p>" * 5,
+        })
+    state = {
+        "app": {"config": {f"flag_{i}": i % 2 == 0 for i in range(500)}},
+        "navigation": [{"title": f"Menu {i}", "url": f"/c/{i}", "children": list(range(20))}
+                       for i in range(300)],
+        "searchListingPage": {
+            "listingData": {"products": products, "total": n_products},
+            "filters": [{"name": f"filter {i}", "options": list(range(30))} for i in range(40)],
+        },
+        "footer": {"links": [f"https://www.nykaa.com/link/{i}" for i in range(500)]},
+    }
+
+    body = "".join(
+        f'<div class="css-{i % 97}"><a href="/p/{i}"><span>Item {i}</span></a></div>'
+        for i in range(filler_items)
+    )
+    html = (
+        "<!DOCTYPE html><html><head><title>Search</title>"
+        '<script>window.dataLayer = [];</script></head><body>'
+        f"{body}<script>window.__PRELOADED_STATE__ = {json.dumps(state)};</script>"
+        f"{body}<script src=\"/static/app.js\"></script></body></html>"
+    )
+    return html.encode()
+
+
+def make_amazon_page(n_cards: int = 48, seed: int = 0) -> str:
+    """
+    An Amazon search page with result cards in the shapes the parser
+    handles: sponsored cards, struck-through MRPs, whole-rupee-only prices,
+    missing image alt text and both rating-count markups.
+    """
+    rng = random.Random(seed)
+    filler = "".join(
+        f'<div class="a-section a-spacing-{i % 5}"><span class="a-color-base">x{i}</span></div>'
+        for i in range(40)
+    )
+    cards = []
+    for i in range(n_cards):
+        brand = rng.choice(BRANDS)
+        name = f"{brand} {rng.choice(LINES)} {rng.choice(SIZES)}".strip()
+        price = rng.randint(150, 2500)
+        mrp = int(price * rng.uniform(1.0, 1.5))
+        alt = name if rng.random() < 0.8 else ""
+        sponsored = ""
+        if i % 7 == 3:
+            sponsored = '<span class="puis-label-popover-default"><span>Sponsored</span></span>'
+        elif i % 11 == 5:
+            sponsored = '<div data-component-type="sp-sponsored-result"></div>'
+        if rng.random() < 0.2:
+            price_html = f'<span class="a-price"><span class="a-price-whole">{price:,}</span></span>'
+        else:
+            price_html = (
+                f'<span class="a-price" data-a-color="base"><span class="a-offscreen">₹{price:,}</span>'
+                f'<span aria-hidden="true"><span class="a-price-symbol">₹</span>'
+                f'<span class="a-price-whole">{price:,}</span></span></span>'
+            )
+        if rng.random() < 0.6:
+            price_html += (
+                f'<span class="a-price a-text-price" data-a-strike="true">'
+                f'<span class="a-offscreen">₹{mrp:,}</span><span aria-hidden="true">₹{mrp:,}</span></span>'
+            )
+        count = rng.randint(1, 50000)
+        if rng.random() < 0.5:
+            count_html = f'<span aria-label="{count:,} ratings"><span>{count:,}</span></span>'
+        else:
+            count_html = f'<a class="a-link-normal"><span class="a-size-base s-underline-text">{count:,}</span></a>'
+        cards.append(
+            f'<div data-component-type="s-search-result" data-asin="B0{i:08d}" class="s-result-item">'
+            f'<div class="puis-card-container">{sponsored}'
+            f'<img class="s-image" src="https://m.media-amazon.com/images/I/{i}.jpg" alt="{alt}">'
+            f'<!-- title --><h2 class="a-size-mini"><a class="a-link-normal" href="/dp/B0{i:08d}" '
+            f'aria-label="{name}"><span class="a-text-normal">{name}</span></a></h2>'
+            f'<div class="a-row"><span class="a-icon-alt">{rng.uniform(3, 5):.1f} out of 5 stars</span>'
+            f'{count_html}</div><div class="a-row">{price_html}</div>'
+            f'<script>P.when("A").execute(function(){{}});</script>{filler}</div></div>'
+        )
+    return (
+        "<!DOCTYPE html><html><head><title>Amazon.in</title></head><body>"
+        f'<div id="search">{filler * 20}{"".join(cards)}{filler * 20}</div></body></html>'
+    )
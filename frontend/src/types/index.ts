@@ -32,11 +32,31 @@ export interface SearchResponse {
   total_results: number;
   platforms_searched: string[];
   platforms_failed: string[];
+  platforms_pending: string[];
   cached: boolean;
+  source: "live" | "cache" | "catalog";
+  stale: boolean;
+  cache_age_seconds: number;
   search_time_ms: number;
   timestamp: string;
 }
 
+export interface PriceBucket {
+  bucket_start: string;
+  min_price: number;
+  max_price: number;
+  avg_price: number;
+  samples: number;
+}
+
+export interface PriceHistory {
+  product_id: number;
+  name: string;
+  brand: string;
+  period: "day" | "week";
+  platforms: Partial<Record<Platform, PriceBucket[]>>;
+}
+
 export interface PlatformInfo {
   id: Platform;
   name: string;